@@ -0,0 +1,77 @@
+-- Natural-key unique indexes for departments and courses.
+--
+-- Runs after init-db.sql on a fresh database (files in this directory are
+-- executed in alphabetical order). For an existing database apply it with:
+--   psql -d ratethatclass -f init-db/migrate-001-natural-keys.sql
+--
+-- Duplicate rows created by earlier imports are merged into a single
+-- surviving row first, re-pointing every reference so no data is lost.
+
+BEGIN;
+
+-- Departments: one row per (university_id, department_name)
+CREATE TEMP TABLE department_duplicates ON COMMIT DROP AS
+SELECT department_id, keep_id
+FROM (
+  SELECT department_id,
+         first_value(department_id) OVER (
+           PARTITION BY university_id, department_name
+           ORDER BY department_id
+         ) AS keep_id
+  FROM public.departments
+) ranked
+WHERE department_id <> keep_id;
+
+UPDATE public.courses c
+SET department_id = d.keep_id
+FROM department_duplicates d
+WHERE c.department_id = d.department_id;
+
+UPDATE public.reports r
+SET entity_id = d.keep_id
+FROM department_duplicates d
+WHERE r.entity_type = 'department' AND r.entity_id = d.department_id;
+
+DELETE FROM public.departments dep
+USING department_duplicates d
+WHERE dep.department_id = d.department_id;
+
+-- Courses: one row per (department_id, course_tag)
+CREATE TEMP TABLE course_duplicates ON COMMIT DROP AS
+SELECT course_id, keep_id
+FROM (
+  SELECT course_id,
+         first_value(course_id) OVER (
+           PARTITION BY department_id, course_tag
+           ORDER BY course_id
+         ) AS keep_id
+  FROM public.courses
+) ranked
+WHERE course_id <> keep_id;
+
+UPDATE public.professors p
+SET course_id = d.keep_id
+FROM course_duplicates d
+WHERE p.course_id = d.course_id;
+
+UPDATE public.reviews rv
+SET course_id = d.keep_id
+FROM course_duplicates d
+WHERE rv.course_id = d.course_id;
+
+UPDATE public.reports r
+SET entity_id = d.keep_id
+FROM course_duplicates d
+WHERE r.entity_type = 'course' AND r.entity_id = d.course_id;
+
+DELETE FROM public.courses c
+USING course_duplicates d
+WHERE c.course_id = d.course_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS departments_university_id_department_name_key
+  ON public.departments (university_id, department_name);
+
+CREATE UNIQUE INDEX IF NOT EXISTS courses_department_id_course_tag_key
+  ON public.courses (department_id, course_tag);
+
+COMMIT;
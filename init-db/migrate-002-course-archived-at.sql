@@ -0,0 +1,9 @@
+-- Soft-delete marker for courses that disappear from a university's catalogue.
+--
+-- Set by the scraper's incremental import (--import-mode incremental
+-- --soft-delete) and cleared again if the course is listed in a later scrape.
+-- For an existing database apply it with:
+--   psql -d ratethatclass -f init-db/migrate-002-course-archived-at.sql
+
+ALTER TABLE public.courses
+  ADD COLUMN IF NOT EXISTS archived_at timestamp with time zone;
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Set
+
+from scraped_files import DATA_DIR, university_file_stem
+
+CHECKPOINT_DIR = os.path.join(DATA_DIR, "checkpoints")
+
+
+class ScrapeCheckpoint:
+    """Per-department checkpoint of a scraper run, appended as each department completes.
+
+    Each line of scraped_data/checkpoints/<University>_checkpoint.ndjson is one
+    completed department with its courses and completion time. A run started
+    with --resume restores departments completed within the freshness window
+    and skips them, so a run that died, or finished with failed departments,
+    only redoes what is missing. A run without --resume starts a new file.
+    """
+
+    def __init__(self, university_name: str):
+        self.university_name = university_name
+        self.path = os.path.join(CHECKPOINT_DIR, f"{university_file_stem(university_name)}_checkpoint.ndjson")
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self, max_age: float) -> Dict[str, List[Dict[str, str]]]:
+        """Departments checkpointed less than max_age seconds ago; a later line for a department wins."""
+        departments: Dict[str, List[Dict[str, str]]] = {}
+        cutoff = time.time() - max_age
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crash mid-write can leave a truncated last line
+                        continue
+                    if entry["completed_at"] >= cutoff:
+                        departments[entry["department"]] = entry["courses"]
+        except FileNotFoundError:
+            pass
+        return departments
+
+    def start(self, resume: bool) -> None:
+        """Open the checkpoint for appending, keeping earlier entries only when resuming."""
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def record(self, department: str, courses: List[Dict[str, str]]) -> None:
+        if self._file is None:
+            return
+        entry = {"department": department, "completed_at": time.time(), "courses": courses}
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False))
+            self._file.write('\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def truncate(self, keep: Set[str]) -> None:
+        """Drop every entry except those for departments in keep, which retain their completion time."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            self._file = open(self.path, 'w', encoding='utf-8')
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry["department"] in keep:
+                    self._file.write(line if line.endswith('\n') else line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
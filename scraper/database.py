@@ -1,17 +1,155 @@
 from psycopg2 import Error
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from logger import setup_logger
+from manifest import record_import, unchanged_departments
+from scraped_files import DATA_DIR, count_courses, iter_departments, iter_ndjson, latest_data_files, read_snapshot
+import io
 import json
 import os
-import glob
 from dotenv import load_dotenv
 import concurrent.futures
-from threading import Lock
-from psycopg2.pool import ThreadedConnectionPool
+import itertools
+from threading import BoundedSemaphore, Lock
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from contextlib import contextmanager
 
 logger = setup_logger(__name__)
 
+IMPORT_MODES = ('bulk', 'incremental', 'row')
+
+def _copy_escape(value: str) -> str:
+    """Escape a value for PostgreSQL's COPY text format"""
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+# Scraped departments as a dict, or as a stream of (department_name, courses) pairs read from NDJSON
+Departments = Union[Dict[str, List[Dict[str, str]]], Iterable[Tuple[str, List[Dict[str, str]]]]]
+
+def _department_items(courses_data: Departments) -> Iterable[Tuple[str, List[Dict[str, str]]]]:
+    return courses_data.items() if isinstance(courses_data, dict) else courses_data
+
+def iter_scraped_file(path: str) -> Tuple[Optional[str], Iterator[Tuple[str, List[Dict[str, str]]]]]:
+    """Return a data file's university name and a lazy stream of its (department_name, courses) pairs.
+
+    NDJSON files are read one line at a time, so memory stays flat however
+    large the catalogue is. Snapshots decode two compressed string columns and
+    slice them per department; legacy .json files are loaded whole.
+    """
+    if path.endswith('.snapshot'):
+        header, departments = read_snapshot(path)
+        return header.get("university_name"), departments
+
+    if path.endswith('.ndjson'):
+        header, courses = iter_ndjson(path)
+        return header.get("university_name"), iter_departments(courses)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+    return json_data.get("university_name"), iter((json_data.get("departments") or {}).items())
+
+class _CopyStream(io.TextIOBase):
+    """File-like object that renders (department_name, course_tag, course_name) rows for COPY on demand."""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str]]):
+        self.rows = iter(rows)
+        self.count = 0
+        self._buffer = ''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                department_name, course_tag, course_name = next(self.rows)
+            except StopIteration:
+                break
+            self.count += 1
+            self._buffer += f"{_copy_escape(department_name)}\t{_copy_escape(course_tag)}\t{_copy_escape(course_name)}\n"
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+def diff_courses(existing: Dict[Tuple[str, str], Tuple[str, str, bool]],
+                 courses_data: Departments) -> Dict:
+    """Diff scraped departments against existing courses keyed by (department_name, course_tag).
+
+    Returns the rows to insert, rename and restore as (department_name,
+    course_tag, course_name) tuples, the keys of courses missing from the
+    snapshot (limited to departments it contains) and an unchanged count.
+    """
+    diff = {"inserts": [], "renames": [], "restores": [], "deletes": [], "unchanged": 0}
+    seen = set()
+    departments = set()
+
+    for department_name, courses in _department_items(courses_data):
+        departments.add(department_name)
+        for course in courses:
+            key = (department_name, course["course_tag"])
+            if key in seen:
+                continue
+            seen.add(key)
+
+            row = (department_name, course["course_tag"], course["course_name"])
+            current = existing.get(key)
+            if current is None:
+                diff["inserts"].append(row)
+            elif current[2]:
+                diff["restores"].append(row)
+            elif current[1] != course["course_name"]:
+                diff["renames"].append(row)
+            else:
+                diff["unchanged"] += 1
+
+    diff["deletes"] = [key for key, (_, _, archived) in existing.items()
+                       if not archived and key[0] in departments and key not in seen]
+    return diff
+
+def plan_import_schedule(json_files: List[str], connection_budget: int, max_parallel: int) -> Tuple[List[str], int, int]:
+    """Order files by course count, largest first, and split the connection budget across concurrent universities.
+
+    Returns (ordered_files, parallel_universities, connections_per_university).
+    Starting the largest universities first keeps the total wall-clock close
+    to the time of the single largest import. Courses are counted rather than
+    bytes because a snapshot holds the same courses in a fraction of the size
+    of its JSON or NDJSON equivalent.
+    """
+    ordered_files = sorted(json_files, key=count_courses, reverse=True)
+    parallel_universities = max(1, min(max_parallel, len(ordered_files), connection_budget))
+    connections_per_university = max(1, connection_budget // parallel_universities)
+    return ordered_files, parallel_universities, connections_per_university
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool that waits for a free connection instead of raising PoolError"""
+
+    def __init__(self, minconn: int, maxconn: int, *args, acquire_timeout: float = 60, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.acquire_timeout = acquire_timeout
+        self._available = BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._available.acquire(timeout=self.acquire_timeout):
+            raise PoolError(f"Timed out after {self.acquire_timeout}s waiting for a free connection")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        except Exception:
+            if close:
+                raise
+            # Returning it failed (e.g. the rollback of a broken connection), so close it instead;
+            # the slot is only freed once the pool has let go of the connection one way or the other
+            super().putconn(conn, key, close=True)
+        self._available.release()
+
 class DatabaseManager:
     def __init__(self):
         load_dotenv()
@@ -26,10 +164,12 @@ class DatabaseManager:
             with logger.lock:
                 raise ValueError("Missing required database configuration. Check your .env file for DB_NAME, DB_USER, and DB_PASSWORD")
         
-        # Initialize connection pool with min=2 and max=20 connections
-        self.pool = ThreadedConnectionPool(
+        # Initialize connection pool with min=2 and max=20 connections; callers
+        # block until a connection is free rather than failing when it is exhausted
+        self.max_connections = 20
+        self.pool = BlockingConnectionPool(
             minconn=2,
-            maxconn=20,
+            maxconn=self.max_connections,
             dbname=self.dbname,
             user=self.user,
             password=self.password,
@@ -39,6 +179,11 @@ class DatabaseManager:
         )
         self.lock = Lock()  # Add thread lock for synchronization
 
+    @property
+    def identity(self) -> str:
+        """Names this database in scrape manifests, so imports into another database are not skipped."""
+        return f"{self.host}:{self.port}/{self.dbname}"
+
     @contextmanager
     def get_db_cursor(self):
         """Context manager for getting a database connection and cursor"""
@@ -98,33 +243,37 @@ class DatabaseManager:
                 logger.error(f"Error getting university ID: {e}")
             return None
 
+    def departments_with_courses(self, university_name: str) -> Set[str]:
+        """Names of the university's departments that have at least one course in the database."""
+        with self.get_db_cursor() as (cursor, _):
+            cursor.execute("""
+                SELECT d.department_name
+                FROM departments d
+                JOIN universities u ON u.university_id = d.university_id
+                WHERE u.university_name = %s
+                  AND EXISTS (SELECT 1 FROM courses c WHERE c.department_id = d.department_id)
+            """, (university_name,))
+            return {department_name for department_name, in cursor.fetchall()}
+
     def insert_department(self, department_name: str, university_id: str) -> Optional[str]:
         try:
             with self.get_db_cursor() as (cursor, _):
-                # First check if the department already exists
-                query = """
-                    SELECT department_id FROM departments
-                    WHERE department_name = %s AND university_id = %s
-                """
-                cursor.execute(query, (department_name, university_id))
-                result = cursor.fetchone()
-                
-                if result:
-                    # Department already exists, return the id
-                    with logger.lock:
-                        logger.info(f"Department '{department_name}' already exists with ID {result[0]}")
-                    return result[0]
-                
-                # Department doesn't exist, insert and return the new id
+                # Upsert on the (university_id, department_name) natural key; the
+                # no-op update makes RETURNING yield the id of an existing row too
                 query = """
                     INSERT INTO departments (department_name, university_id)
                     VALUES (%s, %s)
-                    RETURNING department_id
+                    ON CONFLICT (university_id, department_name)
+                    DO UPDATE SET department_name = EXCLUDED.department_name
+                    RETURNING department_id, (xmax = 0) AS inserted
                 """
                 cursor.execute(query, (department_name, university_id))
-                department_id = cursor.fetchone()[0]
+                department_id, inserted = cursor.fetchone()
                 with logger.lock:
-                    logger.info(f"Created new department '{department_name}' with ID {department_id}")
+                    if inserted:
+                        logger.info(f"Created new department '{department_name}' with ID {department_id}")
+                    else:
+                        logger.info(f"Department '{department_name}' already exists with ID {department_id}")
                 return department_id
         except Error as e:
             with logger.lock:
@@ -134,29 +283,21 @@ class DatabaseManager:
     def insert_course(self, department_id: str, course_tag: str, course_name: str) -> bool:
         try:
             with self.get_db_cursor() as (cursor, _):
-                # Check if course already exists
-                query = """
-                    SELECT course_id FROM courses 
-                    WHERE department_id = %s AND course_tag = %s
-                """
-                cursor.execute(query, (department_id, course_tag))
-                result = cursor.fetchone()
-                
-                if result:
-                    with logger.lock:
-                        logger.info(f"Course '{course_tag}' already exists with ID {result[0]}")
-                    return True
-                    
-                # Insert new course
+                # Upsert on the (department_id, course_tag) natural key, picking up renamed courses
                 query = """
                     INSERT INTO courses (department_id, course_tag, course_name)
                     VALUES (%s, %s, %s)
-                    RETURNING course_id
+                    ON CONFLICT (department_id, course_tag)
+                    DO UPDATE SET course_name = EXCLUDED.course_name
+                    RETURNING course_id, (xmax = 0) AS inserted
                 """
                 cursor.execute(query, (department_id, course_tag, course_name))
-                course_id = cursor.fetchone()[0]
+                course_id, inserted = cursor.fetchone()
                 with logger.lock:
-                    logger.info(f"Created new course '{course_tag}: {course_name}' with ID {course_id}")
+                    if inserted:
+                        logger.info(f"Created new course '{course_tag}: {course_name}' with ID {course_id}")
+                    else:
+                        logger.info(f"Course '{course_tag}' already exists with ID {course_id}")
                 return True
         except Error as e:
             with logger.lock:
@@ -192,8 +333,16 @@ class DatabaseManager:
                 logger.error(f"Error processing department {department_name}: {e}")
             return courses_processed, courses_successful
 
-    def insert_courses_batch(self, university_name: str, courses_data: Dict[str, List[Dict[str, str]]]) -> bool:
+    def insert_courses_batch(self, university_name: str, courses_data: Departments,
+                             max_workers: int = 5) -> bool:
         """Insert multiple courses for a university in a batch using parallel processing."""
+        if not isinstance(courses_data, dict):
+            # Row mode fans departments out to threads, so a streamed file is collected first
+            merged: Dict[str, List[Dict[str, str]]] = {}
+            for department_name, courses in courses_data:
+                merged.setdefault(department_name, []).extend(courses)
+            courses_data = merged
+
         try:
             # Get university ID first
             university_id = self.get_university_id(university_name)
@@ -215,8 +364,8 @@ class DatabaseManager:
             courses_processed = 0
             courses_successful = 0
             
-            # Process departments in parallel, limiting workers to avoid connection pool exhaustion
-            max_workers = min(5, total_departments)  # Limit to 5 concurrent workers
+            # Process departments in parallel, limiting workers to this university's share of the pool
+            max_workers = max(1, min(max_workers, total_departments))
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = [executor.submit(self.process_department_courses, args) for args in process_args]
                 
@@ -233,25 +382,230 @@ class DatabaseManager:
                 logger.error(f"Error in parallel batch insert: {e}")
             return False
 
-    def process_json_file(self, json_file: str) -> bool:
-        """Process a single JSON file"""
+    def _upsert_staged_courses(self, cursor, university_id: str, rows: Iterable[Tuple[str, str, str]],
+                               restore_archived: bool = False) -> Tuple[int, int, int, int]:
+        """COPY (department_name, course_tag, course_name) rows into a staging table and upsert them.
+
+        Rows are rendered for COPY as the server reads them, so a streamed
+        iterable is never held in memory. Returns (rows_staged,
+        departments_created, courses_created, courses_updated). Updated courses
+        are renames, plus previously archived courses that reappeared when
+        restore_archived is set; only the incremental sync, which requires
+        migrate-002, sets it, so the other modes never touch archived_at.
+        """
+        buffer = _CopyStream(rows)
+
+        cursor.execute("""
+            CREATE TEMP TABLE course_staging (
+                department_name text NOT NULL,
+                course_tag text NOT NULL,
+                course_name text NOT NULL
+            ) ON COMMIT DROP
+        """)
+        cursor.copy_expert(
+            "COPY course_staging (department_name, course_tag, course_name) FROM STDIN",
+            buffer
+        )
+
+        cursor.execute("""
+            INSERT INTO departments (department_name, university_id)
+            SELECT DISTINCT s.department_name, %(university_id)s::uuid
+            FROM course_staging s
+            ON CONFLICT (university_id, department_name) DO NOTHING
+        """, {'university_id': university_id})
+        departments_created = cursor.rowcount
+
+        if restore_archived:
+            update = """
+                DO UPDATE SET course_name = EXCLUDED.course_name, archived_at = NULL
+                WHERE courses.course_name IS DISTINCT FROM EXCLUDED.course_name
+                   OR courses.archived_at IS NOT NULL"""
+        else:
+            update = """
+                DO UPDATE SET course_name = EXCLUDED.course_name
+                WHERE courses.course_name IS DISTINCT FROM EXCLUDED.course_name"""
+        cursor.execute("""
+            WITH upserted AS (
+                INSERT INTO courses (department_id, course_tag, course_name)
+                SELECT DISTINCT ON (d.department_id, s.course_tag) d.department_id, s.course_tag, s.course_name
+                FROM course_staging s
+                JOIN departments d
+                  ON d.university_id = %(university_id)s AND d.department_name = s.department_name
+                ORDER BY d.department_id, s.course_tag
+                ON CONFLICT (department_id, course_tag)""" + update + """
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+            FROM upserted
+        """, {'university_id': university_id})
+        courses_created, courses_updated = cursor.fetchone()
+
+        return buffer.count, departments_created, courses_created, courses_updated
+
+    def insert_courses_bulk(self, university_name: str, courses_data: Departments) -> bool:
+        """Insert all courses for a university in one transaction.
+
+        Every course is streamed into a temporary staging table with COPY, then
+        departments and courses are upserted with set-based INSERT ... SELECT
+        ... ON CONFLICT statements instead of one round trip per row.
+        """
+        university_id = self.get_university_id(university_name)
+        if university_id is None:
+            with logger.lock:
+                logger.error(f"Cannot insert courses: University '{university_name}' not found")
+            return False
+
+        departments = set()
+
+        def rows():
+            for department_name, courses in _department_items(courses_data):
+                departments.add(department_name)
+                for course in courses:
+                    yield department_name, course["course_tag"], course["course_name"]
+
+        try:
+            with self.get_db_cursor() as (cursor, _):
+                staged, departments_created, courses_created, courses_updated = self._upsert_staged_courses(
+                    cursor, university_id, rows()
+                )
+
+            with logger.lock:
+                logger.info(f"Bulk import for '{university_name}' complete: staged {staged} courses "
+                            f"across {len(departments)} departments, created {departments_created} departments "
+                            f"and {courses_created} courses, updated {courses_updated} courses")
+            return True
+        except Error as e:
+            with logger.lock:
+                logger.error(f"Error in bulk insert for '{university_name}': {e}")
+            return False
+
+    def courses_have_archived_at(self) -> bool:
+        """Whether migrate-002 has added courses.archived_at to this database."""
+        with self.get_db_cursor() as (cursor, _):
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'courses' AND column_name = 'archived_at'
+            """)
+            return cursor.fetchone() is not None
+
+    def load_existing_courses(self, university_id: str) -> Dict[Tuple[str, str], Tuple[str, str, bool]]:
+        """Load every course of a university keyed by (department_name, course_tag).
+
+        Values are (course_id, course_name, archived).
+        """
+        with self.get_db_cursor() as (cursor, _):
+            cursor.execute("""
+                SELECT d.department_name, c.course_tag, c.course_id, c.course_name, c.archived_at IS NOT NULL
+                FROM courses c
+                JOIN departments d ON d.department_id = c.department_id
+                WHERE d.university_id = %s
+            """, (university_id,))
+            return {(department_name, course_tag): (course_id, course_name, archived)
+                    for department_name, course_tag, course_id, course_name, archived in cursor.fetchall()}
+
+    def sync_courses_incremental(self, university_name: str, courses_data: Departments,
+                                 soft_delete: bool = False) -> bool:
+        """Apply only what changed between the database and a scraped snapshot.
+
+        The existing courses are loaded in one query and diffed in memory, so
+        only new, renamed and (optionally) removed courses are written. Removed
+        courses are soft-deleted by setting archived_at, and only within
+        departments present in the snapshot, so a department that failed to
+        scrape never archives its courses.
+        """
+        university_id = self.get_university_id(university_name)
+        if university_id is None:
+            with logger.lock:
+                logger.error(f"Cannot sync courses: University '{university_name}' not found")
+            return False
+
+        try:
+            if not self.courses_have_archived_at():
+                with logger.lock:
+                    logger.error("Incremental import needs the courses.archived_at column; apply "
+                                 "init-db/migrate-002-course-archived-at.sql to this database first")
+                return False
+
+            existing = self.load_existing_courses(university_id)
+            diff = diff_courses(existing, courses_data)
+
+            upserts = diff["inserts"] + diff["renames"] + diff["restores"]
+            archived = 0
+            departments_created = 0
+            if upserts or (soft_delete and diff["deletes"]):
+                with self.get_db_cursor() as (cursor, _):
+                    if upserts:
+                        _, departments_created, _, _ = self._upsert_staged_courses(cursor, university_id, upserts,
+                                                                                    restore_archived=True)
+                    if soft_delete and diff["deletes"]:
+                        cursor.execute("""
+                            UPDATE courses SET archived_at = now()
+                            WHERE course_id = ANY(%s::uuid[]) AND archived_at IS NULL
+                        """, ([existing[key][0] for key in diff["deletes"]],))
+                        archived = cursor.rowcount
+
+            with logger.lock:
+                logger.info(f"Incremental sync for '{university_name}' complete: {len(diff['inserts'])} inserted, "
+                            f"{len(diff['renames'])} renamed, {len(diff['restores'])} restored, "
+                            f"{archived if soft_delete else 0} archived, {len(diff['deletes'])} missing from snapshot, "
+                            f"{diff['unchanged']} unchanged, {departments_created} new departments")
+            return True
+        except Error as e:
+            with logger.lock:
+                logger.error(f"Error in incremental sync for '{university_name}': {e}")
+            return False
+
+    def process_json_file(self, json_file: str, import_mode: str = 'bulk', soft_delete: bool = False,
+                          max_workers: int = 5, skip_unchanged: bool = True) -> bool:
+        """Process a single .json or .ndjson data file, skipping departments whose pages are unchanged since the last import"""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
+            university_name, departments = iter_scraped_file(json_file)
             
-            university_name = json_data.get("university_name")
-            departments = json_data.get("departments")
+            skipped = set()
+            if skip_unchanged and university_name:
+                # A department is only skipped if this database still has its courses, so a
+                # restored or emptied database is filled again
+                unchanged = unchanged_departments(university_name, self.identity)
+                if unchanged:
+                    unchanged &= self.departments_with_courses(university_name)
+
+                def changed_departments(pairs):
+                    for name, courses in pairs:
+                        if name in unchanged:
+                            skipped.add(name)
+                        else:
+                            yield name, courses
+
+                departments = changed_departments(departments)
             
-            if not university_name or not departments:
+            # Peek at the stream so an empty file is reported without opening a transaction
+            first = next(departments, None)
+            if not university_name or (first is None and not skipped):
                 with logger.lock:
-                    logger.error(f"Invalid JSON format in {json_file}. Missing university_name or departments.")
+                    logger.error(f"Invalid data format in {json_file}. Missing university_name or departments.")
                 return False
+            if first is None:
+                with logger.lock:
+                    logger.info(f"No changed departments to import for {university_name}")
+                return True
+            departments = itertools.chain([first], departments)
             
             with logger.lock:
                 logger.info(f"Processing {university_name} from {json_file}")
             
-            if self.insert_courses_batch(university_name, departments):
+            if import_mode == 'bulk':
+                imported = self.insert_courses_bulk(university_name, departments)
+            elif import_mode == 'incremental':
+                imported = self.sync_courses_incremental(university_name, departments, soft_delete)
+            else:
+                imported = self.insert_courses_batch(university_name, departments, max_workers)
+
+            if imported:
+                record_import(university_name, self.identity)
                 with logger.lock:
+                    if skipped:
+                        logger.info(f"Skipped {len(skipped)} departments unchanged since the last import "
+                                    f"for {university_name}")
                     logger.info(f"Successfully imported data for {university_name}")
                 return True
             else:
@@ -259,33 +613,47 @@ class DatabaseManager:
                     logger.error(f"Failed to import data for {university_name}")
                 return False
                 
-        except (json.JSONDecodeError, FileNotFoundError) as e:
+        # ValueError covers malformed JSON, NDJSON and snapshot files
+        except (FileNotFoundError, KeyError, ValueError) as e:
+            with logger.lock:
+                logger.error(f"Error reading data file {json_file}: {e}")
+            return False
+        except Error as e:
             with logger.lock:
-                logger.error(f"Error reading JSON file {json_file}: {e}")
+                logger.error(f"Database error importing {json_file}: {e}")
             return False
 
-    def load_and_insert_from_json(self) -> bool:
+    def load_and_insert_from_json(self, import_mode: str = 'bulk', soft_delete: bool = False,
+                                  max_parallel: int = 4, skip_unchanged: bool = True) -> bool:
         try:
-            # Always use the scraper's directory as base path
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            json_dir = os.path.join(base_dir, "scraped_data")
-            
-            json_pattern = os.path.join(json_dir, "*.json")
-            json_files = glob.glob(json_pattern)
+            # The newest of each university's .json and .ndjson files in the scraper's data directory
+            json_files = latest_data_files(DATA_DIR)
             
             if not json_files:
                 with logger.lock:
-                    logger.error(f"No JSON files found in directory: {json_dir}")
+                    logger.error(f"No data files found in directory: {DATA_DIR}")
                 return False
                 
             with logger.lock:
-                logger.info(f"Found {len(json_files)} JSON files to process")
+                logger.info(f"Found {len(json_files)} data files to process")
             
-            # Process JSON files sequentially to avoid connection pool exhaustion
+            # Run several universities at once, largest first, each limited to its share of the pool
+            json_files, parallel_universities, connections_per_university = plan_import_schedule(
+                json_files, self.max_connections, max_parallel
+            )
+            with logger.lock:
+                logger.info(f"Importing {parallel_universities} universities at a time with "
+                            f"{connections_per_university} connections each")
+
             successful_imports = 0
-            for json_file in json_files:
-                if self.process_json_file(json_file):
-                    successful_imports += 1
+            with concurrent.futures.ThreadPoolExecutor(max_workers=parallel_universities) as executor:
+                futures = [executor.submit(self.process_json_file, json_file, import_mode, soft_delete,
+                                           connections_per_university, skip_unchanged)
+                           for json_file in json_files]
+
+                for future in concurrent.futures.as_completed(futures):
+                    if future.result():
+                        successful_imports += 1
             
             with logger.lock:
                 logger.info(f"JSON import complete. Successfully imported {successful_imports}/{len(json_files)} files")
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
 import argparse
+import concurrent.futures
+import traceback
+from typing import Optional
 from scrapers import (
     CarletonUScraper,
     OttawaScraper,
@@ -14,40 +17,59 @@ from scrapers import (
     GuelphScraper,
     UofTScraper
 )
+from scrapers.driver_pool import DriverPool
 from utils import run_scraper
 from logger import setup_logger
-from database import DatabaseManager
+from database import DatabaseManager, IMPORT_MODES
+from scraped_files import OUTPUT_FORMATS
 
 logger = setup_logger(__name__)
 
-def run_scraping():
-    scrapers = [
-        WaterlooScraper,
-        CarletonUScraper,
-        OttawaScraper,
-        YorkScraper,
-        OntarioTechScraper,
-        McMasterScraper,
-        UWOScraper,
-        TMUScraper,
-        QueensScraper, 
-        GuelphScraper,
-        UofTScraper
-    ]
-    
+SCRAPERS = [
+    WaterlooScraper,
+    CarletonUScraper,
+    OttawaScraper,
+    YorkScraper,
+    OntarioTechScraper,
+    McMasterScraper,
+    UWOScraper,
+    TMUScraper,
+    QueensScraper, 
+    GuelphScraper,
+    UofTScraper
+]
+
+def run_scraping(parallel: int = 1, drivers: int = 0, use_cache: bool = True, output_format: str = 'json',
+                 resume_max_age: Optional[float] = None):
+    scrapers = SCRAPERS
+
+    if parallel > 1:
+        if drivers:
+            logger.warning("--drivers is ignored with --parallel; each scraper process launches its own browser")
+        return run_scraping_parallel(scrapers, parallel, use_cache, output_format, resume_max_age)
+
     results = {}
     
     logger.info(f"Starting scraping process with {len(scrapers)} scrapers")
     logger.info("JSON files will be saved to 'scraped_data' directory after each scraper completes")
     
-    for i, scraper in enumerate(scrapers, 1):
-        logger.info(f"Running scraper {i}/{len(scrapers)}: {scraper.__name__}")
-        university_name, result = run_scraper(scraper, headless=False)
-        if university_name:
-            results[university_name] = result
-            logger.info(f"[SUCCESS] Completed {scraper.__name__} - Data saved to JSON")
-        else:
-            logger.error(f"[FAILED] {scraper.__name__}")
+    # A shared pool of headless Chrome instances pays browser startup once per run, and
+    # boots in the background so the first Selenium scraper does not wait for it
+    driver_pool = DriverPool(size=drivers).start_in_background() if drivers > 0 else None
+    try:
+        for i, scraper in enumerate(scrapers, 1):
+            logger.info(f"Running scraper {i}/{len(scrapers)}: {scraper.__name__}")
+            university_name, result = run_scraper(scraper, headless=False, driver_pool=driver_pool,
+                                                     use_cache=use_cache, output_format=output_format,
+                                                     resume_max_age=resume_max_age)
+            if university_name:
+                results[university_name] = result
+                logger.info(f"[SUCCESS] Completed {scraper.__name__} - Data saved to JSON")
+            else:
+                logger.error(f"[FAILED] {scraper.__name__}")
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
     
     logger.info(f"Scraping process completed!")
     logger.info(f"Successfully scraped {len(results)} universities: {list(results.keys())}")
@@ -55,11 +77,54 @@ def run_scraping():
 
     return results
 
-def run_database_import():
+def run_scraping_parallel(scrapers, parallel: int, use_cache: bool = True, output_format: str = 'json',
+                          resume_max_age: Optional[float] = None):
+    """Run scrapers concurrently in a process pool, each with its own headless browser or HTTP session.
+
+    Every scraper targets a different university host, so per-host politeness
+    is unchanged; the total run time approaches that of the slowest scraper.
+    """
+    results = {}
+    failures = []
+    workers = min(parallel, len(scrapers))
+
+    logger.info(f"Starting parallel scraping process with {len(scrapers)} scrapers across {workers} processes")
+    logger.info("JSON files will be saved to 'scraped_data' directory as each scraper completes")
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_scraper, scraper, True, None, use_cache, output_format, resume_max_age): scraper
+                   for scraper in scrapers}
+
+        for completed, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            scraper = futures[future]
+            try:
+                university_name, result = future.result()
+            except Exception as e:
+                logger.error(f"[FAILED] {scraper.__name__} ({completed}/{len(scrapers)}): {e}")
+                logger.error(traceback.format_exc())
+                failures.append(scraper.__name__)
+                continue
+
+            if university_name:
+                results[university_name] = result
+                logger.info(f"[SUCCESS] Completed {scraper.__name__} ({completed}/{len(scrapers)}) - Data saved to JSON")
+            else:
+                logger.error(f"[FAILED] {scraper.__name__} ({completed}/{len(scrapers)})")
+                failures.append(scraper.__name__)
+
+    logger.info(f"Scraping process completed!")
+    logger.info(f"Successfully scraped {len(results)} universities: {list(results.keys())}")
+    if failures:
+        logger.error(f"Failed scrapers: {failures}")
+
+    return results
+
+def run_database_import(import_mode: str = 'bulk', soft_delete: bool = False, max_parallel: int = 4,
+                        skip_unchanged: bool = True):
     try:
         with DatabaseManager() as db:
-            logger.info("Starting database import from JSON files")
-            success = db.load_and_insert_from_json()
+            logger.info(f"Starting database import from JSON files ({import_mode} mode)")
+            success = db.load_and_insert_from_json(import_mode, soft_delete, max_parallel, skip_unchanged)
             if success:
                 logger.info("Database import completed successfully")
             else:
@@ -76,6 +141,34 @@ def main():
                            'scrape-and-store: Run scrapers and store data in database\n'
                            'scrape-only: Run scrapers and save to JSON files\n'
                            'store-json: Import existing JSON files into database')
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                      help='Run up to N scrapers concurrently in separate processes, each with a headless browser '
+                           '(default: 1, sequential)')
+    parser.add_argument('--drivers', type=int, default=0, metavar='N',
+                      help='Share a pool of N pre-warmed headless Chrome instances across the Selenium scrapers '
+                           'and spread their departments across them (default: 0, one browser per scraper)')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Ignore the on-disk HTTP cache and download every catalogue page again')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='json',
+                      help='Format of the files in scraped_data:\n'
+                           'json: one JSON document per university, written when its scraper finishes\n'
+                           'ndjson: one course per line, written as each department finishes\n'
+                           'snapshot: compact columnar msgpack file with zstd-compressed course columns')
+    parser.add_argument('--resume', nargs='?', type=float, const=24, default=None, metavar='HOURS',
+                      help='Skip departments checkpointed by an earlier run within the last HOURS hours '
+                           '(default: 24) and reuse their courses')
+    parser.add_argument('--import-mode', choices=IMPORT_MODES, default='bulk',
+                      help='How JSON data is written to the database:\n'
+                           'bulk: COPY each university into a staging table and insert with set-based statements\n'
+                           'incremental: Diff each university against the database and write only changed courses\n'
+                           'row: Insert departments and courses one row at a time')
+    parser.add_argument('--soft-delete', action='store_true',
+                      help='With --import-mode incremental, archive courses that are no longer listed '
+                           'in a scraped department')
+    parser.add_argument('--full-import', action='store_true',
+                      help='Import every department, including those whose pages are unchanged since the last import')
+    parser.add_argument('--import-parallel', type=int, default=4, metavar='N',
+                      help='Number of universities imported concurrently (default: 4)')
     
     args = parser.parse_args()
     success = True
@@ -83,12 +176,14 @@ def main():
 # Execute requested operations
     if args.command in ['scrape-and-store', 'scrape-only']:
         logger.info("Starting scraping process")
-        results = run_scraping()
+        resume_max_age = args.resume * 3600 if args.resume is not None else None
+        results = run_scraping(args.parallel, args.drivers, not args.no_cache, args.output_format, resume_max_age)
         success = success and bool(results)
     
     if args.command in ['scrape-and-store', 'store-json']:
         logger.info("Starting database import")
-        success = success and run_database_import()
+        success = success and run_database_import(args.import_mode, args.soft_delete, args.import_parallel,
+                                                    not args.full_import)
     
     return 0 if success else 1
 
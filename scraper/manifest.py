@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+from logger import setup_logger
+from scraped_files import DATA_DIR, latest_data_file, read_departments, university_file_stem
+
+logger = setup_logger(__name__)
+
+MANIFEST_DIR = os.path.join(DATA_DIR, "manifests")
+
+
+def manifest_path(university_name: str) -> str:
+    return os.path.join(MANIFEST_DIR, f"{university_file_stem(university_name)}_manifest.json")
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable file {path}: {e}")
+        return {}
+
+
+class ScrapeManifest:
+    """Content hashes of the raw pages behind each university's scraped data.
+
+    A source is one fetched payload (a department page, or a whole schedule
+    page) and the departments parsed from it. When a source hashes the same as
+    in the previous run, its departments are copied from the previous data file
+    instead of being parsed again. Sources can also carry the <lastmod> their
+    site's sitemap reports; an unchanged lastmod lets the scraper skip the
+    request altogether. After an import the importer records the
+    hashes it wrote under the database's host, port and name, so the next
+    import into that database can skip departments whose sources have not
+    changed since.
+
+    Manifests live in scraped_data/manifests/ so the importer's *.json glob
+    does not pick them up.
+    """
+
+    def __init__(self, university_name: str):
+        self.university_name = university_name
+        self.path = manifest_path(university_name)
+        previous = _read_json(self.path)
+        self.previous_sources: Dict[str, dict] = previous.get("sources", {})
+        self.imported: Dict[str, str] = previous.get("imported", {})
+        self.sources: Dict[str, dict] = {}
+        self._previous_departments: Optional[Dict[str, List[Dict[str, str]]]] = None
+
+    @staticmethod
+    def digest(payload: str) -> str:
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def previous_departments(self) -> Dict[str, List[Dict[str, str]]]:
+        if self._previous_departments is None:
+            data_file = latest_data_file(self.university_name)
+            try:
+                self._previous_departments = read_departments(data_file) if data_file else {}
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable data file {data_file}: {e}")
+                self._previous_departments = {}
+        return self._previous_departments
+
+    def reuse(self, source: str, digest: str) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """Return the departments parsed from source last run if its payload is unchanged, else None."""
+        previous = self.previous_sources.get(source)
+        if not previous or previous.get("hash") != digest:
+            return None
+        if any(department not in self.previous_departments for department in previous["departments"]):
+            return None
+        return {department: self.previous_departments[department] for department in previous["departments"]}
+
+    def reuse_unmodified(self, source: str, lastmod: Optional[str]) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """Like reuse, keyed on the sitemap lastmod instead of a hash, so the page need not be fetched."""
+        previous = self.previous_sources.get(source)
+        if not lastmod or not previous or previous.get("lastmod") != lastmod:
+            return None
+        departments = self.reuse(source, previous["hash"])
+        if departments is not None:
+            self.sources[source] = {**previous, "unchanged": True}
+        return departments
+
+    def record(self, source: str, digest: str, departments: List[str], unchanged: bool,
+               lastmod: Optional[str] = None) -> None:
+        self.sources[source] = {"hash": digest, "departments": sorted(departments), "unchanged": unchanged}
+        if lastmod:
+            self.sources[source]["lastmod"] = lastmod
+
+    def discard(self, keep: Set[str]) -> None:
+        """Forget sources recorded this run unless every one of their departments is in keep."""
+        self.sources = {source: entry for source, entry in self.sources.items()
+                        if all(department in keep for department in entry["departments"])}
+
+    @property
+    def unchanged_sources(self) -> int:
+        return sum(1 for entry in self.sources.values() if entry["unchanged"])
+
+    def save(self) -> None:
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        data = {
+            "university_name": self.university_name,
+            "scrape_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "sources": self.sources,
+            "imported": self.imported
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        logger.info(f"Manifest saved to {self.path} ({self.unchanged_sources}/{len(self.sources)} sources unchanged)")
+
+
+def _imported_hashes(manifest: dict, database: str) -> Dict[str, str]:
+    imported = manifest.get("imported", {}).get(database)
+    # Manifests written before imports were keyed by database hold a flat map; they match no database
+    return imported if isinstance(imported, dict) else {}
+
+
+def unchanged_departments(university_name: str, database: str) -> Set[str]:
+    """Departments whose every source hashes the same as when it was last imported into database."""
+    manifest = _read_json(manifest_path(university_name))
+    imported = _imported_hashes(manifest, database)
+    changed, unchanged = set(), set()
+    for source, entry in manifest.get("sources", {}).items():
+        target = unchanged if imported.get(source) == entry["hash"] else changed
+        target.update(entry["departments"])
+    return unchanged - changed
+
+
+def record_import(university_name: str, database: str) -> None:
+    """Mark every source in a university's manifest as imported into database at its current hash."""
+    path = manifest_path(university_name)
+    manifest = _read_json(path)
+    if not manifest.get("sources"):
+        return
+    imported = {name: hashes for name, hashes in manifest.get("imported", {}).items() if isinstance(hashes, dict)}
+    imported[database] = {source: entry["hash"] for source, entry in manifest["sources"].items()}
+    manifest["imported"] = imported
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
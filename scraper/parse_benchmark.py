@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Compare parse time and peak memory of the catalogue parsers against a full html.parser soup.
+
+Sample pages are fetched through the HTTP cache, so repeated runs do not hit
+the university sites:
+
+    python parse_benchmark.py
+    python parse_benchmark.py waterloo carleton --repeat 10
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from bs4 import BeautifulSoup
+
+from logger import setup_logger
+from scrapers import CarletonUScraper, OttawaScraper, QueensScraper, WaterlooScraper
+from scrapers.http_engine import FetchRequest
+from scrapers.waterloo_scraper import iter_schedule_rows
+
+logger = setup_logger(__name__)
+
+# The size of the chunks AsyncFetchEngine.stream reads
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def parse_schedule_stream(scraper: WaterlooScraper, html: str):
+    """Waterloo's default streamed parse, fed the cached page in download-sized chunks."""
+    chunks = (html[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(html), STREAM_CHUNK_SIZE))
+    department_courses = {}
+    for department, code, title in iter_schedule_rows(chunks):
+        scraper.add_schedule_row(department_courses, department, code, title)
+    return department_courses
+
+# name -> (scraper class, sample page, current parser, full-tree baseline)
+BENCHMARKS: Dict[str, Tuple[type, str, Callable, Callable]] = {
+    'waterloo': (WaterlooScraper, WaterlooScraper.BASE_URL, parse_schedule_stream,
+                 lambda html: BeautifulSoup(html, 'html.parser').find_all('table')),
+    # The buffered parse Waterloo falls back to when streaming fails
+    'waterloo-buffered': (WaterlooScraper, WaterlooScraper.BASE_URL,
+                          lambda scraper, html: scraper.parse_schedule(html),
+                          lambda html: BeautifulSoup(html, 'html.parser').find_all('table')),
+    'carleton': (CarletonUScraper, f"{CarletonUScraper.BASE_URL}COMP/",
+                 lambda scraper, html: scraper.parse_department(html),
+                 lambda html: BeautifulSoup(html, 'html.parser').find_all('div', class_='courseblock')),
+    'ottawa': (OttawaScraper, f"{OttawaScraper.BASE_URL}/csi/",
+               lambda scraper, html: scraper.parse_department(html),
+               lambda html: BeautifulSoup(html, 'html.parser').find_all('div', class_='courseblock')),
+    'queens': (QueensScraper, QueensScraper.BASE_URL,
+               lambda scraper, html: scraper.parse_subject_options(html),
+               lambda html: BeautifulSoup(html, 'html.parser').find('select', {'id': 'crit-subject'})),
+}
+
+
+def measure(parse: Callable[[str], object], html: str, repeat: int) -> Tuple[float, float]:
+    """Return the best wall time in ms over repeat runs, and the peak traced memory in MB of one run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / (1024 * 1024)
+
+
+def run_benchmark(name: str, repeat: int) -> None:
+    scraper_class, url, parse, baseline = BENCHMARKS[name]
+    scraper = scraper_class(headless=True)
+    scraper.use_http_cache = True
+    with scraper:
+        response = scraper.fetch(FetchRequest(url))
+    if not response.ok:
+        logger.error(f"Could not fetch sample page for {name}: {response.error or response.status}")
+        return
+
+    html = response.text
+    baseline_ms, baseline_mb = measure(baseline, html, repeat)
+    current_ms, current_mb = measure(lambda text: parse(scraper, text), html, repeat)
+    logger.info(f"{name}: {len(html) / 1024:.0f} KiB page | html.parser soup {baseline_ms:.1f} ms, {baseline_mb:.1f} MB "
+                f"| current {current_ms:.1f} ms, {current_mb:.1f} MB "
+                f"| {baseline_ms / current_ms:.1f}x faster, {baseline_mb / max(current_mb, 0.01):.1f}x less memory")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark catalogue page parsers')
+    parser.add_argument('scrapers', nargs='*', metavar='SCRAPER',
+                        help=f"Scrapers to benchmark: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per parser; the best is reported')
+    args = parser.parse_args()
+
+    for name in args.scrapers or sorted(BENCHMARKS):
+        if name not in BENCHMARKS:
+            parser.error(f"unknown scraper {name!r}")
+        run_benchmark(name, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import glob
+import json
+import os
+import threading
+import time
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import msgpack
+import zstandard
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraped_data")
+DATA_SUFFIXES = ("_data.json", "_data.ndjson", "_data.snapshot")
+OUTPUT_FORMATS = ('json', 'ndjson', 'snapshot')
+SNAPSHOT_VERSION = 1
+
+
+def university_file_stem(university_name: str) -> str:
+    """File name stem shared by a university's data file and manifest."""
+    safe_university_name = "".join(c for c in university_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return safe_university_name.replace(' ', '_')
+
+
+def latest_data_files(data_dir: str = DATA_DIR) -> List[str]:
+    """The newest data file per university when it has files in several formats."""
+    latest: Dict[str, str] = {}
+    for suffix in DATA_SUFFIXES:
+        for path in glob.glob(os.path.join(data_dir, f"*{suffix}")):
+            stem = os.path.basename(path)[:-len(suffix)]
+            if stem not in latest or os.path.getmtime(path) > os.path.getmtime(latest[stem]):
+                latest[stem] = path
+    return list(latest.values())
+
+
+def latest_data_file(university_name: str, data_dir: str = DATA_DIR) -> Optional[str]:
+    stem = university_file_stem(university_name)
+    paths = [path for path in (os.path.join(data_dir, f"{stem}{suffix}") for suffix in DATA_SUFFIXES)
+             if os.path.exists(path)]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+class NdjsonWriter:
+    """Writes a university's courses as NDJSON while the scraper runs.
+
+    The first line holds the university and scraper names, and every following
+    line is one course with its department. Courses are appended as departments
+    finish into <university>_data.ndjson.partial, which is flushed to disk each
+    time, so a crash leaves every completed department behind. close() renames
+    the file to <university>_data.ndjson.
+    """
+
+    def __init__(self, university_name: str, scraper_name: str, data_dir: str = DATA_DIR):
+        os.makedirs(data_dir, exist_ok=True)
+        self.path = os.path.join(data_dir, f"{university_file_stem(university_name)}_data.ndjson")
+        self.partial_path = f"{self.path}.partial"
+        self.courses_written = 0
+        # Courses already written per department, so later calls append only what is new
+        self._written: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._header = {
+            "university_name": university_name,
+            "scraper_used": scraper_name,
+            "scrape_timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self._file = open(self.partial_path, 'w', encoding='utf-8')
+        self._write_line(self._header)
+
+    def _write_line(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+
+    def write_new(self, departments: Dict[str, List[Dict[str, str]]], only: Optional[str] = None) -> int:
+        """Append courses not yet written, for one department or all of them. Returns the number written."""
+        with self._lock:
+            names = [only] if only is not None else list(departments)
+            written = 0
+            for department in names:
+                courses = departments.get(department, [])
+                start = self._written.get(department, 0)
+                for course in courses[start:]:
+                    self._write_line({"department": department, **course})
+                    written += 1
+                self._written[department] = len(courses)
+            if written:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.courses_written += written
+            return written
+
+    def reset(self, departments: Dict[str, List[Dict[str, str]]]) -> None:
+        """Start the partial file over with only departments, discarding every course written so far."""
+        with self._lock:
+            self._file.close()
+            self._file = open(self.partial_path, 'w', encoding='utf-8')
+            self._write_line(self._header)
+            self._written = {}
+            self.courses_written = 0
+        self.write_new(departments)
+
+    @property
+    def departments_written(self) -> int:
+        return sum(1 for count in self._written.values() if count)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                os.replace(self.partial_path, self.path)
+
+    def abort(self) -> None:
+        """Close without publishing, leaving the partial file with every department written so far."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def iter_ndjson(path: str) -> Tuple[dict, Iterator[dict]]:
+    """Return the header of an NDJSON data file and a lazy iterator over its course lines."""
+    f = open(path, 'r', encoding='utf-8')
+    header = json.loads(f.readline() or '{}')
+
+    def courses() -> Iterator[dict]:
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    return header, courses()
+
+
+def iter_departments(courses: Iterator[dict]) -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+    """Group consecutive course lines into (department, courses) pairs.
+
+    A department written in several batches yields several pairs.
+    """
+    for department, group in groupby(courses, key=lambda course: course["department"]):
+        yield department, [{"course_tag": course["course_tag"], "course_name": course["course_name"]}
+                           for course in group]
+
+
+def _pack_column(values: List[str], compressor: zstandard.ZstdCompressor) -> bytes:
+    return compressor.compress(msgpack.packb(values))
+
+
+def _unpack_column(blob: bytes, decompressor: zstandard.ZstdDecompressor) -> List[str]:
+    return msgpack.unpackb(decompressor.decompress(blob))
+
+
+def write_snapshot(path: str, university_name: str, scraper_name: str,
+                   departments: Dict[str, List[Dict[str, str]]]) -> None:
+    """Write departments as a compact columnar snapshot.
+
+    The file is a msgpack map: department names are stored once with the number
+    of courses in each, and the course tags and names are two string columns
+    (in department order), each msgpack-encoded and zstd-compressed. Most of a
+    JSON file is repeated keys and indentation, so snapshots are several times
+    smaller and decode without parsing any JSON.
+    """
+    names = [name for name, courses in departments.items() if courses]
+    compressor = zstandard.ZstdCompressor(level=19)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "university_name": university_name,
+        "scraper_used": scraper_name,
+        "scrape_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "departments": names,
+        "department_sizes": [len(departments[name]) for name in names],
+        "course_tags": _pack_column([course["course_tag"] for name in names for course in departments[name]],
+                                    compressor),
+        "course_names": _pack_column([course["course_name"] for name in names for course in departments[name]],
+                                     compressor)
+    }
+    partial_path = f"{path}.partial"
+    with open(partial_path, 'wb') as f:
+        f.write(msgpack.packb(snapshot, use_bin_type=True))
+    os.replace(partial_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[dict, Iterator[Tuple[str, List[Dict[str, str]]]]]:
+    """Return a snapshot's header fields and an iterator of its (department, courses) pairs."""
+    with open(path, 'rb') as f:
+        snapshot = msgpack.unpackb(f.read(), raw=False)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {snapshot.get('version')} in {path}")
+
+    decompressor = zstandard.ZstdDecompressor()
+    try:
+        tags = _unpack_column(snapshot.pop("course_tags"), decompressor)
+        names = _unpack_column(snapshot.pop("course_names"), decompressor)
+    except zstandard.ZstdError as e:
+        raise ValueError(f"Corrupt snapshot {path}: {e}") from e
+    departments = snapshot.pop("departments")
+    sizes = snapshot.pop("department_sizes")
+
+    def pairs() -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+        start = 0
+        for department, size in zip(departments, sizes):
+            yield department, [{"course_tag": tag, "course_name": name}
+                               for tag, name in zip(tags[start:start + size], names[start:start + size])]
+            start += size
+
+    return snapshot, pairs()
+
+
+def read_departments(path: str) -> Dict[str, List[Dict[str, str]]]:
+    """Load every department of a .json, .ndjson or .snapshot data file into memory."""
+    if path.endswith('.snapshot'):
+        _, pairs = read_snapshot(path)
+        return dict(pairs)
+    if path.endswith('.ndjson'):
+        _, courses = iter_ndjson(path)
+        departments: Dict[str, List[Dict[str, str]]] = {}
+        for department, batch in iter_departments(courses):
+            departments.setdefault(department, []).extend(batch)
+        return departments
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("departments") or {}
+
+
+def count_courses(path: str) -> int:
+    """Number of courses in a data file, without building its departments.
+
+    Snapshots carry per-department sizes in their metadata and NDJSON files
+    hold one course per line after the header. JSON files are counted by
+    their course_tag keys, which every course has exactly once.
+    """
+    if path.endswith('.snapshot'):
+        with open(path, 'rb') as f:
+            snapshot = msgpack.unpackb(f.read(), raw=False)
+        return sum(snapshot.get("department_sizes") or [])
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.ndjson'):
+        lines = [line for line in data.split(b'\n')[1:] if line.strip()]
+        return len(lines)
+    return data.count(b'"course_tag"')
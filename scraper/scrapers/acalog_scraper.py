@@ -0,0 +1,235 @@
+import re
+from typing import Dict, List, Tuple, Optional, Any
+from urllib.parse import urljoin
+from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+from .parsing import lxml_document
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+COURSE_LINKS_XPATH = "//a[contains(@onclick, 'showCourse')]"
+PAGE_NUMBER_PATTERN = re.compile(r"filter(?:\[|%5B)cpage(?:\]|%5D)=(\d+)", re.IGNORECASE)
+
+
+def parse_course_links(html: str, separator: str) -> List[Dict[str, str]]:
+    """Courses from an Acalog listing page, whose course links read "<tag><separator><name>"."""
+    courses = []
+    for link in lxml_document(html).xpath(COURSE_LINKS_XPATH):
+        course_parts = ' '.join(link.text_content().split()).split(separator)
+        if len(course_parts) >= 2:
+            course_tag = course_parts[0].strip()
+            course_name = course_parts[1].strip()
+            if course_tag and course_name:
+                courses.append({"course_tag": course_tag, "course_name": course_name})
+    return courses
+
+
+def parse_page_links(html: str, base_url: str) -> Dict[int, str]:
+    """Page number -> absolute URL for every page linked from an Acalog listing's pager.
+
+    The pager hrefs carry the catalogue, navoid and filter parameters of the
+    listing they page through, so they are followed as-is.
+    """
+    pages = {}
+    for href in lxml_document(html).xpath("//a/@href"):
+        match = PAGE_NUMBER_PATTERN.search(href)
+        if match:
+            pages.setdefault(int(match.group(1)), urljoin(base_url, href.split('#', 1)[0]))
+    return pages
+
+
+class AcalogScraper(BaseScraper):
+    """Course descriptions page of an Acalog catalogue (content.php?catoid=...&navoid=...).
+
+    The default backend reads the unfiltered listing over HTTP: page 1 gives
+    the prefix options and the pager, the pages it links to are fetched
+    concurrently, and courses are grouped by prefix. The listing is asked for
+    as many courses per page as the catalogue allows, so it takes a handful of
+    requests rather than one per 100 courses. If every page hashes the same as
+    last run, the previous run's departments are reused without parsing. The
+    Selenium backend searches one prefix at a time and is kept as a fallback.
+    """
+    BASE_URL = ""
+    # Text between the course tag and name in course links
+    COURSE_SEPARATOR = ' - '
+    # Added to the first listing request; the pages to fetch are still read from the
+    # pager, so a catalogue that ignores them is paged through at its default size
+    LISTING_PARAMS: Dict[str, Any] = {"filter[per_page]": 1000}
+
+    default_backend = "http"
+    use_http_cache = True
+
+    def __init__(self, headless: bool = True, backend: Optional[str] = None):
+        super().__init__(headless=headless, timeout=5, backend=backend)
+
+    # HTTP backend
+
+    def parse_department_options(self, html: str) -> List[Tuple[str, str]]:
+        options = lxml_document(html).xpath("//select[@id='courseprefix']/option")
+        return [(option.get('value'), option.text_content().strip()) for option in options[1:] if option.get('value')]
+
+    def first_page_request(self) -> FetchRequest:
+        return FetchRequest(self.BASE_URL, params=self.LISTING_PARAMS or None, key=1)
+
+    def department_for(self, course_tag: str, prefixes: set) -> str:
+        """The #courseprefix value a course belongs to, as the Selenium search would file it."""
+        prefix = course_tag.rsplit(' ', 1)[0]
+        if prefix in prefixes:
+            return prefix
+        return course_tag.split()[0]
+
+    def group_courses(self, pages: List[str], prefixes: set) -> Dict[str, List[Dict[str, str]]]:
+        departments: Dict[str, List[Dict[str, str]]] = {}
+        for page in pages:
+            for course in parse_course_links(page, self.COURSE_SEPARATOR):
+                departments.setdefault(self.department_for(course["course_tag"], prefixes), []).append(course)
+        return departments
+
+    def run_http(self) -> Dict[str, List[Dict[str, str]]]:
+        first_page = self.fetch(self.first_page_request())
+        if not first_page.ok:
+            raise RuntimeError(f"Failed to load course listing: {first_page.error or first_page.status}")
+
+        prefixes = {value for value, _ in self.parse_department_options(first_page.text)}
+        page_links = parse_page_links(first_page.text, first_page.url)
+        page_count = max(page_links, default=1)
+        logger.info(f"Found {len(prefixes)} course prefixes across {page_count} listing pages")
+
+        requests = [FetchRequest(url, key=page) for page, url in sorted(page_links.items()) if page > 1]
+        responses = [first_page] + self.fetch_all(requests)
+        failed = [response.request.key for response in responses if not response.ok]
+        if failed:
+            # A missing page would silently drop part of a department, so let the Selenium backend redo it
+            raise RuntimeError(f"Failed to load listing pages {failed}")
+
+        # Departments run across page boundaries, so the listing is one manifest source: an
+        # unchanged listing reuses last run's departments, any changed page re-parses them all
+        pages = [response.text for response in responses]
+        departments = self.parse_if_changed(self.BASE_URL, '\n'.join(pages),
+                                            lambda _: self.group_courses(pages, prefixes))
+
+        for department, courses in departments.items():
+            if self.is_resumed(department):
+                continue
+            self.add_courses(department, courses)
+            self.complete_department(department)
+
+        logger.info(f"Parsed {sum(len(courses) for courses in departments.values())} courses "
+                    f"in {len(departments)} departments from {page_count} pages")
+        return self.department_courses
+
+    # Selenium backend
+
+    def get_department_options(self) -> List[Tuple[str, str]]:
+        try:
+            checkbox = self.driver.find_element(By.ID, "exact_match")
+            checkbox.click()
+
+            options = self.extract_rows("#courseprefix option", {"value": "@value", "text": None})
+            return [(option["value"], option["text"]) for option in options[1:]]
+        except Exception as e:
+            logger.error(f"Error getting department options: {e}")
+            return []
+
+    def scrape_courses(self, course_rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        department_courses = []
+        for course in course_rows:
+            try:
+                course_parts = (course["text"] or "").split(self.COURSE_SEPARATOR)
+                if len(course_parts) >= 2:
+                    course_tag = course_parts[0].strip()
+                    course_name = course_parts[1].strip()
+                    department_courses.append({
+                        "course_tag": course_tag,
+                        "course_name": course_name
+                    })
+            except Exception as e:
+                logger.error(f"Error scraping course: {e}")
+        return department_courses
+
+    def scrape_department(self, department: str) -> None:
+        """Scrape every results page of the current search. Timeouts propagate so the work queue can retry it."""
+        all_courses = []
+        while True:
+            self.wait.until(
+                EC.presence_of_all_elements_located(
+                    (By.CSS_SELECTOR, 'a[onclick*="showCourse"]')
+                )
+            )
+
+            # Read every course link on the page in one round trip
+            course_rows = self.extract_rows('a[onclick*="showCourse"]', {"text": None})
+            if not course_rows:
+                break
+
+            all_courses.extend(self.scrape_courses(course_rows))
+
+            next_page_element = self.find_next_page()
+            if not next_page_element:
+                break
+
+            # Acalog pages are full document loads, so wait for the next one to replace this one
+            self.wait_for_navigation(lambda: self.driver.execute_script("arguments[0].click();", next_page_element))
+
+        # Courses are only kept once every page is read, so a retried department is not duplicated
+        self.add_courses(department, all_courses)
+
+    def find_next_page(self) -> Optional[Any]:
+        try:
+            current_page_element = self.driver.find_element(
+                By.XPATH, '//td[contains(., "Page:")]//span[@aria-current="page"]//strong'
+            )
+
+            next_page = int(current_page_element.text) + 1
+
+            next_page_link = self.driver.find_element(
+                By.XPATH, f'//td[contains(., "Page:")]//a[text()="{next_page}"]'
+            )
+
+            return next_page_link if next_page_link else None
+        except (NoSuchElementException, TimeoutException):
+            return None
+        except Exception as e:
+            logger.error(f"Error finding next page: {e}")
+            return None
+
+    def ensure_search_form(self) -> None:
+        # Pooled drivers may not have the catalogue open yet; every results
+        # page keeps the filter form, so only a fresh driver needs the base page
+        if not self.driver.find_elements(By.ID, "courseprefix"):
+            self.driver.get(self.BASE_URL)
+            self.driver.find_element(By.ID, "exact_match").click()
+
+    def scrape_department_item(self, i: int, value: str, name: str, total: int) -> None:
+        logger.info(f"Scraping department: {name} ({i}/{total})")
+
+        self.ensure_search_form()
+        script = f"""
+            document.getElementById('courseprefix').value = '{value}';
+            document.getElementById('search-with-filters').click();
+        """
+        self.wait_for_navigation(lambda: self.driver.execute_script(script))
+
+        # Results are keyed by the #courseprefix value the search was made with
+        self.scrape_department(value)
+        self.complete_department(value)
+
+        courses_count = len(self.department_courses.get(value, []))
+        logger.info(f"Scraped {courses_count} courses for {name}")
+
+    def run_selenium(self) -> Dict[str, List[Dict[str, str]]]:
+        try:
+            self.driver.get(self.BASE_URL)
+            departments = self.pending_departments(self.get_department_options(), lambda department: department[0])
+
+            total = len(departments)
+            work_items = [(i, value, name) for i, (value, name) in enumerate(departments, 1)]
+            self.run_work_queue(work_items, lambda item: self.scrape_department_item(*item, total),
+                                describe=lambda item: f"Department {item[2]}")
+
+            return self.department_courses
+        except Exception as e:
+            logger.error(f"Error in run: {e}")
+            return {}
@@ -1,64 +1,477 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+import contextlib
+import functools
+import threading
+import time
 from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.chrome.options import Options
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+from urllib.parse import urlsplit
 
 # Import centralized logger
+from checkpoint import ScrapeCheckpoint
 from logger import setup_logger
+from manifest import ScrapeManifest
+from scraped_files import NdjsonWriter
+from .driver_pool import DriverPool, build_chrome_options
+from .http_cache import HttpCache
+from .http_engine import AsyncFetchEngine, FetchRequest, FetchResult
+from .rate_limiter import HostRateLimiters
+from .work_queue import RetryableError, WorkQueue
 
 # Get configured logger
 logger = setup_logger(__name__)
 
+# Reads every matching row in one WebDriver round trip. Each field spec is a
+# CSS selector relative to the row (falsy for the row itself), optionally
+# suffixed with "@attribute", or a list of such specs tried in order.
+EXTRACT_ROWS_SCRIPT = """
+const [rowSelector, fields] = arguments;
+const read = (row, spec) => {
+    const [selector, attribute] = (spec || '').split('@');
+    const element = selector ? row.querySelector(selector) : row;
+    if (!element) return null;
+    // Like WebElement.get_attribute, prefer the property so hrefs come back absolute
+    const value = !attribute ? element.innerText
+        : attribute in element ? element[attribute] : element.getAttribute(attribute);
+    return value === null || value === undefined ? null : String(value).trim();
+};
+return Array.from(document.querySelectorAll(rowSelector)).map(row => {
+    const record = {};
+    for (const [name, specs] of Object.entries(fields)) {
+        record[name] = null;
+        for (const spec of Array.isArray(specs) ? specs : [specs]) {
+            const value = read(row, spec);
+            if (value !== null) { record[name] = value; break; }
+        }
+    }
+    return record;
+});
+"""
+
+# Resolves once the DOM has seen no mutations for `quiet` ms, or false after `limit` ms
+DOM_IDLE_SCRIPT = """
+const [quiet, limit, done] = arguments;
+let timer;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(() => { observer.disconnect(); done(true); }, quiet);
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(() => { observer.disconnect(); done(true); }, quiet);
+setTimeout(() => { observer.disconnect(); done(false); }, limit);
+"""
+
+# Cheap summary of a result list used to detect when a page or filter change has rendered
+FINGERPRINT_SCRIPT = """
+const elements = document.querySelectorAll(arguments[0]);
+if (!elements.length) return '0';
+return elements.length + '|' + elements[0].innerText + '|' + elements[elements.length - 1].innerText;
+"""
+
 class BaseScraper(ABC):
-    def __init__(self, headless: bool = True, timeout: int = 10):
+    # Limits for the shared HTTP fetch engine used by non-browser scrapers;
+    # requests_per_second is the starting rate, which adapts to the server
+    # between an eighth of it and max_requests_per_second (default 4x)
+    max_concurrency_per_host = 4
+    requests_per_second = 4.0
+    max_requests_per_second: Optional[float] = None
+
+    # Starting rate at which browser scrapers that pace themselves with
+    # paced() begin departments on a host; it adapts the same way
+    departments_per_second = 0.5
+
+    # Catalogue scrapers opt in to the on-disk HTTP cache; within the TTL a
+    # cached page is reused without a request, after it the page is revalidated
+    use_http_cache = False
+    http_cache_ttl = 6 * 60 * 60
+
+    # Department work items that raise one of these are requeued with
+    # exponential backoff, up to max_attempts per item
+    retryable_errors = (RetryableError, TimeoutException, StaleElementReferenceException)
+    max_attempts = 3
+    retry_base_delay = 2.0
+    retry_max_delay = 30.0
+
+    # Readiness timeouts in seconds, tuned per site by overriding entries
+    readiness_timeouts = {"navigation": 15, "stable": 10, "idle": 10, "change": 10}
+
+    # Scrapers with a browserless implementation default to "http" and only
+    # launch Chrome if they fall back to their Selenium implementation
+    default_backend = "selenium"
+
+    def __init__(self, headless: bool = True, timeout: int = 10, backend: Optional[str] = None):
+        # Worker threads in run_work_queue see their own leased driver through
+        # self.driver/self.wait, so scraper code is unchanged when parallelised
+        self._local = threading.local()
+        self._courses_lock = threading.Lock()
+        self._wait_lock = threading.Lock()
+        self.wait_stats: Dict[str, List[float]] = {}
         self.timeout = timeout
         self.headless = headless
+        self.backend = backend or self.default_backend
         self.driver = None
         self.wait = None
+        self.driver_pool: Optional[DriverPool] = None
+        self.http = None
+        self.department_rate_limiters = HostRateLimiters(self.departments_per_second)
+        self.manifest: Optional[ScrapeManifest] = None
+        # Set by run_scraper to stream departments to disk as they complete
+        self.output: Optional[NdjsonWriter] = None
+        # Set by run_scraper; completed departments are checkpointed so a failed run can resume
+        self.checkpoint: Optional[ScrapeCheckpoint] = None
+        self.resumed_departments: Set[str] = set()
         self.department_courses: Dict[str, List[Dict[str, str]]] = {}
         self.university_name = "Default University"
+
+    @property
+    def driver(self):
+        return getattr(self._local, 'driver', None) or self._driver
+
+    @driver.setter
+    def driver(self, driver):
+        self._driver = driver
+
+    @property
+    def wait(self):
+        return getattr(self._local, 'wait', None) or self._wait
+
+    @wait.setter
+    def wait(self, wait):
+        self._wait = wait
         
     def setup_driver(self):
-        options = Options()
-        if self.headless:
-            options.add_argument("--headless=new")
-        
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-images")
-        options.page_load_strategy = 'eager'
-        
-        self.driver = webdriver.Chrome(options=options)
+        if self.driver_pool is not None:
+            self.driver = self.driver_pool.acquire()
+        else:
+            self.driver = webdriver.Chrome(options=build_chrome_options(self.headless))
         self.wait = WebDriverWait(self.driver, self.timeout)
         
     def cleanup(self):
+        self.report_wait_stats()
+        self.department_rate_limiters.report()
         if self.driver:
             try:
-                self.driver.quit()
+                if self.driver_pool is not None and self.driver in self.driver_pool.drivers:
+                    self.driver_pool.release(self.driver)
+                else:
+                    self.driver.quit()
             except Exception as e:
                 logger.error(f"Error during driver cleanup: {e}")
             finally:
                 self.driver = None
                 self.wait = None
+        if self.http:
+            try:
+                self.http.close()
+            except Exception as e:
+                logger.error(f"Error during HTTP engine cleanup: {e}")
+            finally:
+                self.http = None
+
+    def use_selenium_fallback(self):
+        """Switch a browserless scraper to its Selenium implementation, launching Chrome if needed."""
+        logger.warning(f"Falling back to Selenium for {self.university_name}")
+        self.backend = "selenium"
+        # Departments restored from a checkpoint are kept; everything else is scraped again, so the
+        # output, checkpoint and manifest forget what the failed HTTP pass wrote for them
+        with self._courses_lock:
+            self.department_courses = {name: courses for name, courses in self.department_courses.items()
+                                       if name in self.resumed_departments}
+            kept = {name: list(courses) for name, courses in self.department_courses.items()}
+        try:
+            if self.output is not None:
+                self.output.reset(kept)
+            if self.checkpoint is not None:
+                self.checkpoint.truncate(set(self.resumed_departments))
+        except OSError as e:
+            logger.error(f"Failed to discard partial results before falling back: {e}")
+        if self.manifest is not None:
+            self.manifest.discard(set(self.resumed_departments))
+        if self.driver is None:
+            self.setup_driver()
+
+    def run_work_queue(self, items: List[Any], handler: Callable[[Any], Any],
+                       describe: Optional[Callable[[Any], str]] = None, workers: Optional[int] = None) -> List[Any]:
+        """Run handler(item) for department-level work items through a WorkQueue.
+
+        Handlers raise RetryableError (or one of retryable_errors) for transient
+        failures; the item is requeued with backoff while the rest carry on.
+        Selenium scrapers running on a pooled driver spread items across the
+        pooled Chrome instances, and inside the handler self.driver and self.wait
+        refer to the worker's leased driver. Without a pool, Selenium items run
+        in order on the scraper's own driver. Browserless scrapers run up to
+        max_concurrency_per_host items at once. workers caps the concurrency;
+        workers=1 runs items in order on the scraper's own driver.
+        """
+        queue = functools.partial(WorkQueue, handler, max_attempts=self.max_attempts,
+                                  base_delay=self.retry_base_delay, max_delay=self.retry_max_delay,
+                                  retryable=self.retryable_errors,
+                                  describe=describe or (lambda item: f"Work item {item}"))
+        if self.backend != "selenium":
+            return queue(workers=min(workers or self.max_concurrency_per_host, self.max_concurrency_per_host)).run(items)
+        # Scrapers that build their own browser, like York, keep to it
+        if (workers == 1 or self.driver_pool is None or self.driver_pool.size < 2
+                or self._driver not in self.driver_pool.drivers):
+            return queue().run(items)
+
+        @contextlib.contextmanager
+        def leased_driver():
+            with self.driver_pool.lease() as driver:
+                self._local.driver = driver
+                self._local.wait = WebDriverWait(driver, self.timeout)
+                try:
+                    yield
+                finally:
+                    self._local.driver = None
+                    self._local.wait = None
+
+        # Hand the scraper's own driver back so every instance can take work items
+        self.driver_pool.release(self._driver)
+        try:
+            return queue(workers=min(workers or self.driver_pool.size, self.driver_pool.size),
+                         worker_context=leased_driver).run(items)
+        finally:
+            self.driver = self.driver_pool.acquire()
+            self.wait = WebDriverWait(self.driver, self.timeout)
+
+    # Readiness layer: explicit, event-driven waits instead of fixed sleeps
+
+    def timed_wait(self, condition: Callable[[Any], Any], timeout: Optional[float] = None,
+                   description: str = "condition") -> Any:
+        """WebDriverWait.until with fast polling, recording how long was spent waiting."""
+        start = time.monotonic()
+        try:
+            return WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=0.1).until(condition)
+        finally:
+            self.record_wait(description, time.monotonic() - start)
+
+    def record_wait(self, description: str, seconds: float) -> None:
+        with self._wait_lock:
+            self.wait_stats.setdefault(description, []).append(seconds)
+
+    def report_wait_stats(self) -> None:
+        if not self.wait_stats:
+            return
+        total = sum(sum(times) for times in self.wait_stats.values())
+        count = sum(len(times) for times in self.wait_stats.values())
+        logger.info(f"{self.university_name}: spent {total:.1f}s in {count} readiness waits")
+        for description, times in sorted(self.wait_stats.items(), key=lambda item: -sum(item[1])):
+            logger.info(f"  {description}: {sum(times):.1f}s over {len(times)} waits (max {max(times):.2f}s)")
+        self.wait_stats = {}
+
+    def wait_for_navigation(self, action: Callable[[], Any], timeout: Optional[float] = None) -> None:
+        """Run an action that loads a new document and wait until the old one is gone and the new one is parsed."""
+        timeout = timeout or self.readiness_timeouts["navigation"]
+        old_document = self.driver.find_element(By.TAG_NAME, "html")
+        action()
+        self.timed_wait(EC.staleness_of(old_document), timeout, "navigation")
+        self.timed_wait(lambda driver: driver.execute_script("return document.readyState") != "loading",
+                        timeout, "navigation")
+
+    def wait_for_count_stable(self, selector: str, stable_for: float = 0.5, timeout: Optional[float] = None) -> int:
+        """Wait until at least one element matches selector and the count stops changing for stable_for seconds."""
+        state = {"count": -1, "since": time.monotonic()}
+
+        def count_is_stable(driver):
+            count = driver.execute_script("return document.querySelectorAll(arguments[0]).length", selector)
+            now = time.monotonic()
+            if count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return count if count > 0 and now - state["since"] >= stable_for else False
+
+        return self.timed_wait(count_is_stable, timeout or self.readiness_timeouts["stable"], f"stable {selector}")
+
+    def wait_for_dom_idle(self, quiet_period: float = 0.3, timeout: Optional[float] = None) -> bool:
+        """Wait until the DOM stops mutating for quiet_period seconds. Returns False if it never settled."""
+        timeout = timeout or self.readiness_timeouts["idle"]
+        self.driver.set_script_timeout(timeout + 5)
+        start = time.monotonic()
+        try:
+            return bool(self.driver.execute_async_script(DOM_IDLE_SCRIPT, int(quiet_period * 1000), int(timeout * 1000)))
+        finally:
+            self.record_wait("dom idle", time.monotonic() - start)
+
+    def result_fingerprint(self, selector: str) -> str:
+        return self.driver.execute_script(FINGERPRINT_SCRIPT, selector)
+
+    def wait_for_results_change(self, selector: str, previous: str, timeout: Optional[float] = None) -> str:
+        """Wait until the elements matching selector differ from a fingerprint taken before an action."""
+        def results_changed(driver):
+            fingerprint = driver.execute_script(FINGERPRINT_SCRIPT, selector)
+            return fingerprint if fingerprint != previous else False
+
+        return self.timed_wait(results_changed, timeout or self.readiness_timeouts["change"], f"change {selector}")
+
+    @contextlib.contextmanager
+    def paced(self, url: str):
+        """Pace a block of browser work against url's host, in place of a fixed politeness sleep.
+
+        Waits for the host's next slot, then feeds the block's duration back
+        to its AdaptiveRateLimiter; a TimeoutException counts as the server
+        struggling and halves the rate.
+        """
+        limiter = self.department_rate_limiters.get(urlsplit(url).netloc)
+        limiter.wait()
+        start = time.monotonic()
+        try:
+            yield
+        except TimeoutException:
+            limiter.record(time.monotonic() - start, ok=False)
+            raise
+        limiter.record(time.monotonic() - start, ok=True)
+
+    def extract_rows(self, row_selector: str, fields: Dict[str, Any]) -> List[Dict[str, Optional[str]]]:
+        """Extract text/attributes for every row matching row_selector with a single execute_script call.
+
+        e.g. extract_rows("td.sorting_1", {"name": None, "link": "a@href"})
+        """
+        return self.driver.execute_script(EXTRACT_ROWS_SCRIPT, row_selector, fields) or []
+
+    def get_http_engine(self) -> AsyncFetchEngine:
+        if self.http is None:
+            self.http = AsyncFetchEngine(
+                per_host_limit=self.max_concurrency_per_host,
+                requests_per_second=self.requests_per_second,
+                timeout=self.timeout,
+                cache=HttpCache(ttl=self.http_cache_ttl) if self.use_http_cache else None,
+                max_requests_per_second=self.max_requests_per_second
+            )
+        return self.http
+
+    def fetch(self, request: FetchRequest) -> FetchResult:
+        return self.get_http_engine().fetch(request)
+
+    def stream(self, request: FetchRequest) -> Iterator[str]:
+        """Decoded response body chunks as they download, for pages too large to hold as text; see AsyncFetchEngine.stream."""
+        return self.get_http_engine().stream(request)
+
+    def fetch_or_requeue(self, request: FetchRequest) -> FetchResult:
+        """fetch for a work queue handler: a transient failure raises RetryableError so the item is requeued."""
+        response = self.fetch(request)
+        if not response.ok and response.retryable:
+            raise RetryableError(response.error or f"HTTP {response.status}")
+        return response
+
+    def fetch_all(self, requests: List[FetchRequest]) -> List[FetchResult]:
+        """Fetch requests concurrently under the per-host concurrency and rate limits."""
+        return self.get_http_engine().fetch_all(requests)
+
+    def get_manifest(self) -> ScrapeManifest:
+        if self.manifest is None:
+            self.manifest = ScrapeManifest(self.university_name)
+        return self.manifest
+
+    def parse_if_changed(self, source: str, payload: str,
+                         parse: Callable[[str], Dict[str, List[Dict[str, str]]]],
+                         lastmod: Optional[str] = None) -> Dict[str, List[Dict[str, str]]]:
+        """Parse payload into department -> courses, or reuse last run's departments if its hash is unchanged.
+
+        source names the payload in the manifest, e.g. a department code or page URL;
+        lastmod, if the site publishes one, is recorded for reuse_if_unmodified.
+        """
+        manifest = self.get_manifest()
+        digest = ScrapeManifest.digest(payload)
+        departments = manifest.reuse(source, digest)
+        unchanged = departments is not None
+        if not unchanged:
+            departments = parse(payload)
+        manifest.record(source, digest, list(departments), unchanged, lastmod)
+        return departments
+
+    def parse_department_if_changed(self, department: str, payload: str,
+                                    parse: Callable[[str], List[Dict[str, str]]],
+                                    lastmod: Optional[str] = None) -> List[Dict[str, str]]:
+        """parse_if_changed for a page holding one department's courses."""
+        departments = self.parse_if_changed(department, payload, lambda text: {department: parse(text)}, lastmod)
+        return departments.get(department, [])
+
+    def reuse_if_unmodified(self, source: str, lastmod: Optional[str]) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """Last run's departments for source if its lastmod is unchanged, without fetching it; else None."""
+        return self.get_manifest().reuse_unmodified(source, lastmod)
     
     def add_course(self, department: str, course_tag: str, course_name: str):
-        if department not in self.department_courses:
-            self.department_courses[department] = []
-            
-        self.department_courses[department].append({
-            "course_tag": course_tag.strip(),
-            "course_name": course_name.strip()
-        })
+        with self._courses_lock:
+            if department not in self.department_courses:
+                self.department_courses[department] = []
+                
+            self.department_courses[department].append({
+                "course_tag": course_tag.strip(),
+                "course_name": course_name.strip()
+            })
+
+    def add_courses(self, department: str, courses: List[Dict[str, str]]):
+        for course in courses:
+            self.add_course(department, course["course_tag"], course["course_name"])
+
+    def complete_department(self, department: Optional[str] = None):
+        """Hook called when a department finishes.
+
+        Writes its new courses, or all new courses, to the output and
+        checkpoints the department if it has any courses.
+        """
+        if self.output is None and self.checkpoint is None:
+            return
+        with self._courses_lock:
+            snapshot = {name: list(courses) for name, courses in self.department_courses.items()
+                        if department is None or name == department}
+        try:
+            if self.output is not None:
+                self.output.write_new(snapshot, department)
+            if self.checkpoint is not None and department is not None and snapshot.get(department):
+                self.checkpoint.record(department, snapshot[department])
+        except OSError as e:
+            logger.error(f"Error writing courses for {department or 'completed departments'}: {e}")
+
+    def restore_departments(self, departments: Dict[str, List[Dict[str, str]]]):
+        """Seed results with departments checkpointed by an earlier run so they are not scraped again."""
+        with self._courses_lock:
+            self.department_courses.update(departments)
+            self.resumed_departments.update(departments)
+        if departments:
+            logger.info(f"Resuming {self.university_name}: {len(departments)} departments restored from checkpoint")
+
+    def is_resumed(self, department: str) -> bool:
+        return department in self.resumed_departments
+
+    def pending_departments(self, items: List[Any], key: Callable[[Any], str]) -> List[Any]:
+        """Drop work items whose department, key(item), was restored from the checkpoint."""
+        if not self.resumed_departments:
+            return items
+        pending = [item for item in items if not self.is_resumed(key(item))]
+        logger.info(f"Skipping {len(items) - len(pending)} checkpointed departments, {len(pending)} left to scrape")
+        return pending
     
-    @abstractmethod
     def run(self) -> Dict[str, List[Dict[str, str]]]:
-        pass
+        """Scrape with the configured backend: run_http, falling back to run_selenium if it fails or finds nothing.
+
+        Scrapers with a single implementation, or their own notion of backends, override run instead.
+        """
+        if self.backend == "http":
+            try:
+                departments = self.run_http()
+                if departments:
+                    return departments
+                logger.warning("HTTP backend found no courses")
+            except Exception as e:
+                logger.error(f"Error in HTTP backend: {e}")
+            self.use_selenium_fallback()
+
+        return self.run_selenium()
+
+    def run_http(self) -> Dict[str, List[Dict[str, str]]]:
+        raise NotImplementedError(f"{type(self).__name__} has no HTTP backend")
+
+    def run_selenium(self) -> Dict[str, List[Dict[str, str]]]:
+        raise NotImplementedError(f"{type(self).__name__} has no Selenium backend")
     
     def __enter__(self):
-        self.setup_driver()
+        if self.backend == "selenium":
+            self.setup_driver()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -0,0 +1,136 @@
+from abc import abstractmethod
+from typing import Dict, List, Tuple
+
+import lxml.etree
+
+from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+
+
+def parse_sitemap(xml: bytes) -> Dict[str, str]:
+    """URL -> <lastmod> for every <url> in a sitemap that gives one, with trailing slashes stripped."""
+    root = lxml.etree.fromstring(xml, parser=lxml.etree.XMLParser(recover=True))
+    if root is None:
+        return {}
+    entries = {}
+    # local-name() so sitemaps with or without the sitemaps.org namespace both parse
+    for url in root.xpath("//*[local-name()='url']"):
+        loc = url.xpath("string(*[local-name()='loc'])").strip()
+        lastmod = url.xpath("string(*[local-name()='lastmod'])").strip()
+        if loc and lastmod:
+            entries[loc.rstrip('/')] = lastmod
+    return entries
+
+
+class CourseLeafScraper(BaseScraper):
+    """Course pages of a CourseLeaf catalogue: an index linking to one page of div.courseblock entries per department.
+
+    CourseLeaf publishes a sitemap.xml with the <lastmod> of every page. A
+    department whose lastmod matches the one recorded in the manifest last
+    run reuses that run's courses without a request. The others are fetched
+    through the HTTP cache and only re-parsed if their content hash changed.
+    """
+    BASE_URL = ""
+    SITEMAP_URL = ""
+
+    use_http_cache = True
+
+    def __init__(self, headless: bool = True):
+        super().__init__(headless=headless, timeout=10)
+
+    def setup_driver(self):
+        pass
+
+    def index_request(self) -> FetchRequest:
+        return FetchRequest(self.BASE_URL)
+
+    @abstractmethod
+    def parse_department_options(self, html: str) -> List[Tuple[str, str]]:
+        """(code, name) for every department linked from the index page."""
+        pass
+
+    @abstractmethod
+    def department_request(self, department_code: str) -> FetchRequest:
+        """Request for a department page, keyed by the department its courses are stored under."""
+        pass
+
+    @abstractmethod
+    def parse_department(self, html: str) -> List[Dict[str, str]]:
+        pass
+
+    def get_department_options(self) -> List[Tuple[str, str]]:
+        try:
+            response = self.fetch(self.index_request())
+            if not response.ok:
+                logger.error(f"Failed to load department list: {response.error or response.status}")
+                return []
+            return self.parse_department_options(response.text)
+        except Exception as e:
+            logger.error(f"Error getting department options: {e}")
+            return []
+
+    def fetch_sitemap(self) -> Dict[str, str]:
+        """Page URL -> lastmod from the catalogue's sitemap, or {} if it is unavailable."""
+        if not self.SITEMAP_URL:
+            return {}
+        # The sitemap is what tells us whether cached pages are stale, so never serve it from the cache
+        response = self.fetch(FetchRequest(self.SITEMAP_URL, cacheable=False))
+        if not response.ok:
+            logger.warning(f"Failed to load sitemap, fetching every department: {response.error or response.status}")
+            return {}
+        try:
+            sitemap = parse_sitemap(response.text.encode('utf-8'))
+        except lxml.etree.XMLSyntaxError as e:
+            logger.warning(f"Could not parse sitemap, fetching every department: {e}")
+            return {}
+        logger.info(f"Sitemap lists {len(sitemap)} pages with a lastmod")
+        return sitemap
+
+    def scrape_department(self, i: int, department_code: str, name: str, total: int,
+                          sitemap: Dict[str, str]) -> bool:
+        """Fetch and parse one department page, unless the sitemap says it is unmodified. Returns whether it had any courses."""
+        request = self.department_request(department_code)
+        department = request.key
+        lastmod = sitemap.get(request.url.rstrip('/'))
+
+        previous = self.reuse_if_unmodified(department, lastmod)
+        if previous is not None:
+            self.add_courses(department, previous.get(department, []))
+            logger.info(f"Department {name} ({i}/{total}) unmodified since {lastmod}, reusing last run's courses")
+        else:
+            logger.info(f"Scraping department: {name} ({i}/{total})")
+            response = self.fetch_or_requeue(request)
+            if not response.ok:
+                logger.error(f"Failed to fetch department {name}: {response.error or response.status}")
+                return False
+            # Pages that hash the same as last run reuse their previously parsed courses
+            self.add_courses(department, self.parse_department_if_changed(department, response.text,
+                                                                          self.parse_department, lastmod))
+        self.complete_department(department)
+
+        course_count = len(self.department_courses.get(department, []))
+        if course_count == 0:
+            logger.warning(f"No courses found for department {name} ({department_code})")
+            return False
+        logger.info(f"Found {course_count} courses for department {name}")
+        return True
+
+    def run(self) -> Dict[str, List[Dict[str, str]]]:
+        try:
+            departments = self.get_department_options()
+            logger.info(f"Found {len(departments)} departments")
+            departments = self.pending_departments(departments,
+                                                   lambda department: self.department_request(department[0]).key)
+            sitemap = self.fetch_sitemap()
+
+            # Department pages are fetched concurrently under the per-host rate limit
+            total = len(departments)
+            work_items = [(i, value, name) for i, (value, name) in enumerate(departments, 1)]
+            results = self.run_work_queue(work_items, lambda item: self.scrape_department(*item, total, sitemap),
+                                          describe=lambda item: f"Department {item[2]}")
+
+            logger.info(f"Successfully scraped {sum(1 for found in results if found)}/{total} departments")
+            return self.department_courses
+        except Exception as e:
+            logger.error(f"Error in run: {e}")
+            return {}
@@ -0,0 +1,122 @@
+import queue
+import threading
+import concurrent.futures
+from contextlib import contextmanager
+from typing import List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def build_chrome_options(headless: bool = True) -> Options:
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-images")
+    options.page_load_strategy = 'eager'
+    return options
+
+
+class DriverPool:
+    """A fixed set of pre-warmed Chrome instances shared by every Selenium scraper in a run.
+
+    Scrapers lease a driver instead of launching their own, so Chrome startup
+    is paid once per run, and department work items can be spread across
+    several instances at once.
+    """
+
+    def __init__(self, size: int = 3, headless: bool = True, lease_timeout: float = 300):
+        self.size = size
+        self.headless = headless
+        self.lease_timeout = lease_timeout
+        self.drivers: List[webdriver.Chrome] = []
+        self._idle: "queue.Queue[webdriver.Chrome]" = queue.Queue()
+        # Held while instances launch, so acquire and close wait for a background start to finish
+        self._start_lock = threading.Lock()
+
+    def start_in_background(self) -> "DriverPool":
+        """Launch the instances on a separate thread, so Chrome boots while browserless scrapers run."""
+        def start():
+            try:
+                self.start()
+            except Exception as e:
+                # acquire retries the launch, and reports the failure to the scraper that needed a driver
+                logger.error(f"Background start of the driver pool failed: {e}")
+
+        threading.Thread(target=start, name="driver-pool-start", daemon=True).start()
+        return self
+
+    def start(self) -> "DriverPool":
+        """Launch every instance concurrently."""
+        with self._start_lock:
+            return self._start()
+
+    def _start(self) -> "DriverPool":
+        if self.drivers:
+            return self
+
+        logger.info(f"Starting driver pool with {self.size} Chrome instances")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(webdriver.Chrome, options=build_chrome_options(self.headless))
+                       for _ in range(self.size)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    driver = future.result()
+                except Exception as e:
+                    logger.error(f"Error starting pooled Chrome instance: {e}")
+                    continue
+                self.drivers.append(driver)
+                self._idle.put(driver)
+
+        if not self.drivers:
+            raise RuntimeError("Could not start any Chrome instance for the driver pool")
+        self.size = len(self.drivers)
+        return self
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        if not self.drivers:
+            self.start()
+        try:
+            return self._idle.get(timeout=timeout or self.lease_timeout)
+        except queue.Empty:
+            raise RuntimeError("Timed out waiting for a pooled Chrome instance")
+
+    def release(self, driver: webdriver.Chrome) -> None:
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        with self._start_lock:
+            self._close()
+
+    def _close(self) -> None:
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f"Error during pooled driver cleanup: {e}")
+        self.drivers = []
+        self._idle = queue.Queue()
+        logger.info("Driver pool closed")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,42 +1,175 @@
+import json
+import re
 from typing import Dict, List, Tuple, Optional, Any
-import time
-import random
+from urllib.parse import parse_qs, urljoin, urlsplit
 from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+from .parsing import inner_text, lxml_document
+from .work_queue import RetryableError
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+TOKEN_PATTERN = re.compile(r'name="__RequestVerificationToken"[^>]*value="([^"]+)"')
+
+
 class GuelphScraper(BaseScraper):
+    """Guelph's Colleague Self-Service course catalogue.
+
+    The default backend skips the browser and posts each subject straight to
+    Self-Service's Courses/SearchAsync JSON endpoint, the one its search page
+    calls, with a large page size. Subjects run concurrently under the
+    per-host rate limit. The Selenium backend pages through the rendered
+    search results and is kept as a fallback.
+    """
     BASE_URL = "https://colleague-ss.uoguelph.ca/Student/Courses"
+    SEARCH_URL = "https://colleague-ss.uoguelph.ca/Student/Courses/SearchAsync"
+    ADVANCED_SEARCH_URL = "https://colleague-ss.uoguelph.ca/Student/Courses/GetCatalogAdvancedSearchAsync"
+    SEARCH_PAGE_SIZE = 500
+    COURSE_SELECTOR = 'h3 span[id^="course-"]'
+    readiness_timeouts = {**BaseScraper.readiness_timeouts, "stable": 15, "change": 15}
+
+    default_backend = "http"
 
-    def __init__(self, headless: bool = True):
-        super().__init__(headless=headless, timeout=10)
+    def __init__(self, headless: bool = True, backend: Optional[str] = None):
+        super().__init__(headless=headless, timeout=30, backend=backend)
         self.university_name = "University of Guelph"
-        
+        # Self-Service rejects posts without the anti-forgery token from the catalogue page
+        self.verification_token: Optional[str] = None
+
+    # HTTP backend
+
+    def parse_subject_links(self, html: str) -> List[Tuple[str, str]]:
+        """(subject code, department name) for each catalog-subject-* link, named as the Selenium backend names them."""
+        subjects = []
+        for link in lxml_document(html).xpath("//a[starts-with(@id, 'catalog-subject-')]"):
+            query = parse_qs(urlsplit(urljoin(self.BASE_URL, link.get('href') or '')).query)
+            code = (query.get('subjects') or [None])[0]
+            name = link.get('title') or inner_text(link)
+            if code and name:
+                subjects.append((code, name))
+        return subjects
+
+    def get_subjects(self) -> List[Tuple[str, str]]:
+        # The page sets the session's anti-forgery cookie, so it is never served from the cache
+        page = self.fetch(FetchRequest(self.BASE_URL, cacheable=False))
+        if not page.ok:
+            raise RuntimeError(f"Failed to load course catalogue: {page.error or page.status}")
+        match = TOKEN_PATTERN.search(page.text)
+        self.verification_token = match.group(1) if match else None
+
+        subjects = self.parse_subject_links(page.text)
+        if subjects:
+            return subjects
+
+        # Newer Self-Service versions render the subject list client-side from the advanced search options
+        response = self.fetch(FetchRequest(self.ADVANCED_SEARCH_URL, headers=self.search_headers(), cacheable=False))
+        if not response.ok:
+            raise RuntimeError(f"Failed to load subjects: {response.error or response.status}")
+        return [(subject["Code"], subject.get("Description") or subject["Code"])
+                for subject in response.json().get("Subjects", []) if subject.get("Code")]
+
+    def search_headers(self) -> Dict[str, str]:
+        headers = {'Referer': self.BASE_URL, 'X-Requested-With': 'XMLHttpRequest'}
+        if self.verification_token:
+            headers['__RequestVerificationToken'] = self.verification_token
+        return headers
+
+    def search_request(self, subject_code: str, page: int = 1) -> FetchRequest:
+        data = {
+            "subjects": [subject_code],
+            "pageNumber": page,
+            "quantityPerPage": self.SEARCH_PAGE_SIZE,
+            "sortOn": "None",
+            "sortDirection": "Ascending",
+            "searchResultsView": "CatalogListing",
+        }
+        return FetchRequest(self.SEARCH_URL, method='POST', json=data, headers=self.search_headers(),
+                            key=(subject_code, page))
+
+    @staticmethod
+    def course_from_record(record: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        title = (record.get("Title") or "").strip()
+        if record.get("SubjectCode") and record.get("Number"):
+            course_tag = f"{record['SubjectCode']} {record['Number']}"
+        else:
+            # e.g. "ACCT*1220", as shown in the rendered results
+            course_tag = (record.get("CourseName") or "").replace('*', ' ').strip()
+        if course_tag and title:
+            return {"course_tag": course_tag, "course_name": title}
+        return None
+
+    def parse_search_pages(self, payload: str) -> List[Dict[str, str]]:
+        courses = []
+        for page in json.loads(payload):
+            for record in page.get("Courses") or []:
+                course = self.course_from_record(record)
+                if course:
+                    courses.append(course)
+        return courses
+
+    def scrape_subject(self, i: int, code: str, name: str, total: int) -> bool:
+        """Fetch every page of one subject's search. Returns whether it had any courses."""
+        logger.info(f"Scraping department: {name} ({i}/{total})")
+        first_page = self.fetch_or_requeue(self.search_request(code))
+        if not first_page.ok:
+            logger.error(f"Search failed for {name}: {first_page.error or first_page.status}")
+            return False
+
+        page_count = first_page.json().get("TotalPages") or 1
+        responses = [first_page] + self.fetch_all([self.search_request(code, page) for page in range(2, page_count + 1)])
+        failed = [response.request.key[1] for response in responses if not response.ok]
+        if failed:
+            raise RetryableError(f"pages {failed} of {page_count} failed")
+
+        # Searches that hash the same as last run reuse their previously parsed courses
+        payload = "[" + ",".join(response.text for response in responses) + "]"
+        self.add_courses(name, self.parse_department_if_changed(name, payload, self.parse_search_pages))
+        self.complete_department(name)
+
+        courses_count = len(self.department_courses.get(name, []))
+        logger.info(f"Found {courses_count} courses for {name} in {page_count} pages")
+        return courses_count > 0
+
+    def run_http(self) -> Dict[str, List[Dict[str, str]]]:
+        subjects = self.get_subjects()
+        logger.info(f"Found {len(subjects)} departments")
+        subjects = self.pending_departments(subjects, lambda subject: subject[1])
+
+        total = len(subjects)
+        work_items = [(i, code, name) for i, (code, name) in enumerate(subjects, 1)]
+        results = self.run_work_queue(work_items, lambda item: self.scrape_subject(*item, total),
+                                      describe=lambda item: f"Department {item[2]}")
+
+        logger.info(f"Successfully scraped {sum(1 for found in results if found)}/{total} departments")
+        return self.department_courses
+
+    # Selenium backend
+
     def get_department_options(self) -> List[Tuple[str, str]]:
         try:
             logger.info("Getting department options...")
             
             # Wait for department links to load
-            department_elements = self.wait.until(
+            self.wait.until(
                 EC.presence_of_all_elements_located(
                     (By.CSS_SELECTOR, 'a.esg-list-group__item[id^="catalog-subject-"]')
                 )
             )
             
+            department_rows = self.extract_rows(
+                'a.esg-list-group__item[id^="catalog-subject-"]',
+                {"href": "@href", "title": "@title", "text": None}
+            )
+            
             departments = []
-            for element in department_elements:
-                try:
-                    href = element.get_attribute('href')
-                    department_name = element.get_attribute('title') or element.text.strip()
-                    
-                    if href and department_name:
-                        departments.append((href, department_name))
-                        
-                except Exception as e:
-                    logger.error(f"Error parsing department element: {e}")
-                    continue
+            for row in department_rows:
+                href = row["href"]
+                department_name = row["title"] or row["text"]
+                
+                if href and department_name:
+                    departments.append((href, department_name))
             
             logger.info(f"Found {len(departments)} departments")
             return departments
@@ -45,13 +178,12 @@ class GuelphScraper(BaseScraper):
             logger.error(f"Error getting department options: {e}")
             return []
 
-    def scrape_courses(self, course_elements: List) -> List[Dict[str, str]]:
+    def scrape_courses(self, course_rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
         department_courses = []
-        for course in course_elements:
+        for course in course_rows:
             try:
-                span_element = course.find_element(By.TAG_NAME, "span")
-                if span_element:
-                    course_text = span_element.text.strip()
+                if course["text"]:
+                    course_text = course["text"]
                     
                     # Remove credits part if it exists (text in parentheses at the end)
                     if ' (' in course_text and course_text.endswith(')'):
@@ -92,63 +224,50 @@ class GuelphScraper(BaseScraper):
             logger.error(f"Error finding next page: {e}")
             return None
 
-    def scrape_department(self, department_link: str, department_name: str, max_retries: int = 2) -> None:
-        retry_count = 0
-        page_number = 1
+    def scrape_department(self, department_link: str, department_name: str) -> None:
+        """Scrape every page of a department. Timeouts propagate so the work queue can retry it."""
+        logger.info(f"Navigating to: {department_link}")
+        self.driver.get(department_link)
         
-        while retry_count < max_retries:
-            try:
-                logger.info(f"Scraping department: {department_name} - Page {page_number}")
-                
-                # Navigate to department page only on first page
-                if page_number == 1:
-                    logger.info(f"Navigating to: {department_link}")
-                    self.driver.get(department_link)
-                    time.sleep(2)
-                
-                # Wait for course elements
-                course_elements = self.wait.until(
-                    EC.presence_of_all_elements_located(
-                        (By.CSS_SELECTOR, 'h3 span[id^="course-"]')
-                    )
-                )
-                
-                if not course_elements:
-                    logger.warning(f"No courses found for {department_name} on page {page_number}")
-                    break
-                
-                h3_elements = [elem.find_element(By.XPATH, './..') for elem in course_elements]
-                courses = self.scrape_courses(h3_elements)
-                
-                if courses:
-                    if department_name in self.department_courses:
-                        self.department_courses[department_name].extend(courses)
-                    else:
-                        self.department_courses[department_name] = courses
-                
-                logger.info(f"Found {len(courses)} courses on page {page_number} for {department_name}")
-
-                # Try to find and click next page
-                next_page = self.find_next_page()
-                if not next_page:
-                    break
+        all_courses = []
+        page_number = 1
+        while True:
+            logger.info(f"Scraping department: {department_name} - Page {page_number}")
+            
+            # Wait for the course list to finish rendering
+            self.wait_for_count_stable(self.COURSE_SELECTOR)
+            
+            # Read the first span of every course heading in one round trip
+            course_rows = self.extract_rows('h3:has(> span[id^="course-"])', {"text": "span"})
+            if not course_rows:
+                logger.warning(f"No courses found for {department_name} on page {page_number}")
+                break
+            
+            courses = self.scrape_courses(course_rows)
+            all_courses.extend(courses)
+            logger.info(f"Found {len(courses)} courses on page {page_number} for {department_name}")
 
-                self.driver.execute_script("arguments[0].click();", next_page)
-                page_number += 1
-                time.sleep(2)
-                
-            except TimeoutException:
-                retry_count += 1
-                if retry_count >= max_retries:
-                    logger.warning(f"Max retries reached when scraping department {department_name}")
-                    break
-                logger.warning(f"Timeout occurred, retrying... ({retry_count}/{max_retries})")
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"Error in scrape_department for {department_name}: {e}")
+            # Try to find and click next page
+            next_page = self.find_next_page()
+            if not next_page:
                 break
 
-    def run(self) -> Dict[str, List[Dict[str, str]]]:
+            previous_page = self.result_fingerprint(self.COURSE_SELECTOR)
+            self.driver.execute_script("arguments[0].click();", next_page)
+            page_number += 1
+            self.wait_for_results_change(self.COURSE_SELECTOR, previous_page)
+
+        # Courses are only kept once every page is read, so a retried department is not duplicated
+        self.add_courses(department_name, all_courses)
+
+    def scrape_department_item(self, i: int, link: str, name: str, total: int) -> None:
+        logger.info(f"Scraping department: {name} ({i}/{total})")
+        
+        with self.paced(link):
+            self.scrape_department(link, name)
+        self.complete_department(name)
+
+    def run_selenium(self) -> Dict[str, List[Dict[str, str]]]:
         try:
             self.driver.get(self.BASE_URL)
             
@@ -157,19 +276,12 @@ class GuelphScraper(BaseScraper):
             if not departments:
                 logger.warning("No departments found")
                 return {}
+            departments = self.pending_departments(departments, lambda department: department[1])
             
             total = len(departments)
-            for i, (link, name) in enumerate(departments, 1):
-                try:
-                    logger.info(f"Scraping department: {name} ({i}/{total})")
-                    
-                    self.scrape_department(link, name)
-                    
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping department {name}: {e}")
-                    continue
+            work_items = [(i, link, name) for i, (link, name) in enumerate(departments, 1)]
+            self.run_work_queue(work_items, lambda item: self.scrape_department_item(*item, total),
+                                describe=lambda item: f"Department {item[2]}")
             
             logger.info(f"Scraping completed. Found {len(self.department_courses)} departments")
             return self.department_courses
@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "http_cache")
+
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Content-Type')
+
+
+class CacheEntry:
+    def __init__(self, key: str, url: str, status: int, headers: Dict[str, str], text: str, stored_at: float):
+        self.key = key
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self.stored_at = stored_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('Last-Modified')
+
+
+class HttpCache:
+    """On-disk cache of successful HTTP responses for the fetch engine.
+
+    Entries are keyed by method, URL, query parameters and request body, and
+    bodies are stored gzip-compressed. Within `ttl` seconds an entry is served
+    without touching the network; after that it is revalidated with
+    If-None-Match/If-Modified-Since.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: Optional[float] = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.stats = {"fresh": 0, "revalidated": 0, "stored": 0}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def key_for(method: str, url: str, params: Any = None, data: Any = None, json_body: Any = None) -> str:
+        material = json.dumps([method.upper(), url, params, data, json_body], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}{suffix}")
+
+    def _write(self, path: str, payload: bytes) -> None:
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+
+    def count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key, '.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with gzip.open(self._path(key, '.body.gz'), 'rt', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+        return CacheEntry(key, meta['url'], meta['status'], meta['headers'], text, meta['stored_at'])
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self.ttl is not None and time.time() - entry.stored_at < self.ttl
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key: str, url: str, status: int, headers: Dict[str, str], text: str) -> None:
+        # Only validators are kept, under canonical names since servers vary the case
+        kept = {name.lower(): value for name, value in headers.items()}
+        meta = {"url": url, "status": status, "stored_at": time.time(),
+                "headers": {name: kept[name.lower()] for name in CACHED_HEADERS if name.lower() in kept}}
+        self._write(self._path(key, '.body.gz'), gzip.compress(text.encode('utf-8')))
+        self._write(self._path(key, '.json'), json.dumps(meta).encode('utf-8'))
+        self.count("stored")
+
+    def touch(self, entry: CacheEntry) -> None:
+        """Restart the TTL of an entry the server confirmed is unchanged."""
+        entry.stored_at = time.time()
+        meta = {"url": entry.url, "status": entry.status, "stored_at": entry.stored_at, "headers": entry.headers}
+        self._write(self._path(entry.key, '.json'), json.dumps(meta).encode('utf-8'))
+
+    def report_stats(self) -> None:
+        if any(self.stats.values()):
+            logger.info(f"HTTP cache: {self.stats['fresh']} fresh hits, {self.stats['revalidated']} revalidated (304), "
+                        f"{self.stats['stored']} downloaded")
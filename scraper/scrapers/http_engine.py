@@ -0,0 +1,317 @@
+import asyncio
+import codecs
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from logger import setup_logger
+from .http_cache import CacheEntry, HttpCache
+from .rate_limiter import THROTTLE_STATUSES, AdaptiveRateLimiter, HostRateLimiters, parse_retry_after
+
+logger = setup_logger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+RETRYABLE_STATUSES = THROTTLE_STATUSES
+
+
+class FetchRequest:
+    """A single HTTP request for the fetch engine. `key` is an opaque caller identifier.
+
+    Set `cacheable=False` for requests tied to server-side session state.
+    """
+
+    def __init__(self, url: str, method: str = 'GET', params: Optional[Dict[str, Any]] = None,
+                 data: Any = None, json: Any = None, headers: Optional[Dict[str, str]] = None,
+                 encoding: Optional[str] = None, key: Any = None, cacheable: bool = True):
+        self.url = url
+        self.method = method
+        self.params = params
+        self.data = data
+        self.json = json
+        self.headers = headers
+        self.encoding = encoding
+        self.key = key
+        self.cacheable = cacheable
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+    @property
+    def cache_key(self) -> str:
+        return HttpCache.key_for(self.method, self.url, self.params, self.data, self.json)
+
+
+class FetchResult:
+    def __init__(self, request: FetchRequest, status: Optional[int] = None, text: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None, error: Optional[Exception] = None,
+                 elapsed: float = 0.0, url: Optional[str] = None, from_cache: bool = False):
+        self.request = request
+        # Final URL after redirects, used to resolve relative links
+        self.url = url or request.url
+        self.status = status
+        self.text = text
+        self.headers = headers or {}
+        self.error = error
+        self.elapsed = elapsed
+        # True when the body was served from the HTTP cache, fresh or after a 304
+        self.from_cache = from_cache
+
+    @classmethod
+    def from_cache_entry(cls, request: FetchRequest, entry: CacheEntry) -> "FetchResult":
+        return cls(request, entry.status, entry.text, entry.headers, url=entry.url, from_cache=True)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    @property
+    def retryable(self) -> bool:
+        return self.error is not None or self.status in RETRYABLE_STATUSES
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        return parse_retry_after(self.headers.get('Retry-After'))
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class AsyncFetchEngine:
+    """Shared aiohttp fetch engine for the non-browser scrapers.
+
+    The event loop runs on a background thread so scrapers keep a plain
+    synchronous interface: `fetch` for one request and `fetch_all` to fan a
+    list of requests out concurrently. Each host gets its own concurrency
+    limit and an adaptive (AIMD) rate limit that speeds up while responses
+    stay fast and backs off on 429/5xx, timeouts and Retry-After; failed
+    requests are retried with exponential backoff. With an HttpCache, fresh entries skip the network
+    and stale ones are revalidated with a conditional request.
+    """
+
+    def __init__(self, per_host_limit: int = 4, requests_per_second: float = 4.0, timeout: float = 10,
+                 max_retries: int = 3, retry_delay: float = 1.0, headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[HttpCache] = None, max_requests_per_second: Optional[float] = None):
+        self.per_host_limit = per_host_limit
+        self.requests_per_second = requests_per_second
+        self.rate_limiters = HostRateLimiters(requests_per_second, max_rate=max_requests_per_second)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.cache = cache
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._start_lock = threading.Lock()
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="http-engine", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _run(self, coroutine) -> Any:
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    def _host_limits(self, host: str):
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host], self.rate_limiters.get(host)
+
+    async def _send(self, request: FetchRequest, extra_headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        session = await self._get_session()
+        semaphore, limiter = self._host_limits(request.host)
+        headers = {**(request.headers or {}), **extra_headers} if extra_headers else request.headers
+
+        async with semaphore:
+            await self._wait_for_slot(limiter)
+            start = time.monotonic()
+            try:
+                async with session.request(request.method, request.url, params=request.params,
+                                           data=request.data, json=request.json,
+                                           headers=headers) as response:
+                    text = await response.text(encoding=request.encoding, errors='replace')
+                    result = FetchResult(request, response.status, text, dict(response.headers),
+                                         elapsed=time.monotonic() - start, url=str(response.url))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result = FetchResult(request, error=e, elapsed=time.monotonic() - start)
+
+        limiter.record(result.elapsed, result.ok or result.status == 304, result.status, result.retry_after)
+        return result
+
+    @staticmethod
+    async def _wait_for_slot(limiter: AdaptiveRateLimiter) -> None:
+        delay = limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _fetch(self, request: FetchRequest) -> FetchResult:
+        if self.cache is None or not request.cacheable:
+            return await self._fetch_network(request)
+
+        # Cache files are read and written off the event loop so other requests keep flowing
+        loop = asyncio.get_running_loop()
+        key = request.cache_key
+        entry = await loop.run_in_executor(None, self.cache.load, key)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.count("fresh")
+            return FetchResult.from_cache_entry(request, entry)
+
+        conditional = self.cache.conditional_headers(entry) if entry is not None else None
+        result = await self._fetch_network(request, conditional)
+        if entry is not None and result.status == 304:
+            await loop.run_in_executor(None, self.cache.touch, entry)
+            self.cache.count("revalidated")
+            return FetchResult.from_cache_entry(request, entry)
+
+        if result.ok:
+            try:
+                await loop.run_in_executor(None, self.cache.store, key, result.url, result.status,
+                                           result.headers, result.text)
+            except OSError as e:
+                logger.warning(f"Could not cache response from {request.url}: {e}")
+        return result
+
+    async def _fetch_network(self, request: FetchRequest, extra_headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        for attempt in range(self.max_retries):
+            result = await self._send(request, extra_headers)
+            if result.ok or result.status == 304 or not result.retryable or attempt == self.max_retries - 1:
+                break
+
+            # Honour Retry-After when the server asks for a longer wait than the backoff
+            delay = max(self.retry_delay * (2 ** attempt), result.retry_after or 0)
+            reason = result.error or f"HTTP {result.status}"
+            logger.warning(f"Request to {request.url} failed ({reason}), retrying in {delay:.1f}s "
+                           f"(Attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+        if not result.ok and result.status != 304:
+            logger.error(f"Request to {request.url} failed: {result.error or f'HTTP {result.status}'}")
+        return result
+
+    async def _fetch_all(self, requests: List[FetchRequest]) -> List[FetchResult]:
+        return await asyncio.gather(*(self._fetch(request) for request in requests))
+
+    def fetch(self, request: FetchRequest) -> FetchResult:
+        return self._run(self._fetch(request))
+
+    def fetch_all(self, requests: List[FetchRequest]) -> List[FetchResult]:
+        """Fetch every request concurrently, returning results in request order."""
+        if not requests:
+            return []
+        return self._run(self._fetch_all(requests))
+
+    async def _stream(self, request: FetchRequest, chunk_size: int, put) -> None:
+        session = await self._get_session()
+        semaphore, limiter = self._host_limits(request.host)
+        # The session's total timeout would cut off a long download; only stalls count here
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+
+        async with semaphore:
+            await self._wait_for_slot(limiter)
+            start = time.monotonic()
+            try:
+                async with session.request(request.method, request.url, params=request.params,
+                                           data=request.data, json=request.json, headers=request.headers,
+                                           timeout=timeout) as response:
+                    # Time to first byte is what the limiter compares across requests
+                    ok = 200 <= response.status < 300
+                    limiter.record(time.monotonic() - start, ok, response.status,
+                                   parse_retry_after(response.headers.get('Retry-After')))
+                    start = None
+                    response.raise_for_status()
+                    # Decoded like FetchResult.text, so a streamed page hashes the same as a fetched one
+                    decoder = codecs.getincrementaldecoder(request.encoding or response.charset or 'utf-8')(errors='replace')
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        text = decoder.decode(chunk)
+                        if text:
+                            await put(text)
+                    tail = decoder.decode(b'', final=True)
+                    if tail:
+                        await put(tail)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if start is not None:
+                    limiter.record(time.monotonic() - start, False)
+                raise
+
+    def stream(self, request: FetchRequest, chunk_size: int = 64 * 1024, buffer_chunks: int = 16) -> Iterator[str]:
+        """Yield the response body as decoded text chunks as it downloads, under the host's concurrency and rate limits.
+
+        At most buffer_chunks chunks wait between the download and the caller,
+        so a slow consumer slows the download rather than buffering the whole
+        body. Streams bypass the cache and are not retried; a failed request
+        raises aiohttp.ClientError or asyncio.TimeoutError from the iterator.
+        """
+        loop = self._ensure_started()
+        chunks: "queue.Queue[Any]" = queue.Queue(maxsize=buffer_chunks)
+        closed = threading.Event()
+        finished = object()
+
+        def put_blocking(item: Any) -> None:
+            while not closed.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        async def produce() -> None:
+            put = lambda chunk: loop.run_in_executor(None, put_blocking, chunk)
+            try:
+                await self._stream(request, chunk_size, put)
+            finally:
+                await put(finished)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), loop)
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is finished:
+                    break
+                yield chunk
+            future.result()
+        finally:
+            # A caller that stops early releases the producer instead of leaving it blocked on a full queue
+            closed.set()
+            if not future.done():
+                future.cancel()
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.report_stats()
+        self.rate_limiters.report()
+        with self._start_lock:
+            if self._loop is None:
+                return
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+                self._session = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._host_semaphores.clear()
@@ -0,0 +1,146 @@
+from abc import abstractmethod
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+from .parsing import inner_text, lxml_document
+
+
+def listing_links(html: str, base_url: str) -> Dict[str, str]:
+    """Name -> absolute URL for each row of a DataTables department listing.
+
+    In the browser DataTables marks the sorted first column td.sorting_1; the
+    server-rendered table has no such class, so the first cell of every row
+    with a link is used instead.
+    """
+    document = lxml_document(html)
+    cells = (document.xpath("//td[contains(concat(' ', normalize-space(@class), ' '), ' sorting_1 ')]")
+             or document.xpath("//table//tr/td[1][.//a[@href]]"))
+    links = {}
+    for cell in cells:
+        hrefs = cell.xpath(".//a/@href")
+        name = inner_text(cell)
+        if name and hrefs:
+            links[name] = urljoin(base_url, hrefs[0])
+    return links
+
+
+class ListingScraper(BaseScraper):
+    """A static calendar whose department listing table links to one page of courses per department.
+
+    Each course is one COURSE_TAG.COURSE_CLASS element whose text subclasses
+    split into a tag and name with parse_course. The default backend fetches
+    the listing and the department pages over HTTP, the latter concurrently,
+    and parses them with lxml. The Selenium backend is kept as a fallback.
+    """
+    BASE_URL = ""
+    COURSE_TAG = ""
+    COURSE_CLASS = ""
+
+    default_backend = "http"
+    use_http_cache = True
+
+    def __init__(self, headless: bool = True, backend: Optional[str] = None):
+        super().__init__(headless=headless, backend=backend)
+
+    @abstractmethod
+    def parse_course(self, department_name: str, course_text: str) -> Optional[Dict[str, str]]:
+        """The course tag and name in one course element's text, or None if it does not parse."""
+        pass
+
+    # HTTP backend
+
+    def parse_courses(self, department_name: str, html: str) -> List[Dict[str, str]]:
+        courses = []
+        elements = lxml_document(html).xpath(
+            f"//{self.COURSE_TAG}[contains(concat(' ', normalize-space(@class), ' '), ' {self.COURSE_CLASS} ')]")
+        for element in elements:
+            course = self.parse_course(department_name, inner_text(element))
+            if course:
+                courses.append(course)
+        return courses
+
+    def scrape_department_http(self, i: int, name: str, link: str, total: int) -> bool:
+        """Fetch and parse one department page. Returns whether it had any courses."""
+        logger.info(f"Scraping department: {name} ({i}/{total})")
+        response = self.fetch_or_requeue(FetchRequest(link))
+        if not response.ok:
+            logger.error(f"Failed to fetch department {name}: {response.error or response.status}")
+            return False
+
+        # Pages that hash the same as last run reuse their previously parsed courses
+        self.add_courses(name, self.parse_department_if_changed(name, response.text,
+                                                                lambda html: self.parse_courses(name, html)))
+        self.complete_department(name)
+
+        courses_count = len(self.department_courses.get(name, []))
+        logger.info(f"Scraped {courses_count} courses for {name}")
+        return courses_count > 0
+
+    def run_http(self) -> Dict[str, List[Dict[str, str]]]:
+        response = self.fetch(FetchRequest(self.BASE_URL))
+        if not response.ok:
+            raise RuntimeError(f"Failed to load department list: {response.error or response.status}")
+        department_links = listing_links(response.text, response.url)
+        logger.info(f"Found {len(department_links)} departments")
+
+        pending = self.pending_departments(list(department_links.items()), lambda department: department[0])
+        total = len(pending)
+        work_items = [(i, name, link) for i, (name, link) in enumerate(pending, 1)]
+        # Department pages are fetched concurrently under the per-host rate limit
+        results = self.run_work_queue(work_items, lambda item: self.scrape_department_http(*item, total),
+                                      describe=lambda item: f"Department {item[1]}")
+
+        logger.info(f"Successfully scraped {sum(1 for found in results if found)}/{total} departments")
+        return self.department_courses
+
+    # Selenium backend
+
+    def get_department_links(self) -> Dict[str, str]:
+        department_links = {}
+
+        for department in self.extract_rows("td.sorting_1", {"name": None, "link": "a@href"}):
+            if department["name"] and department["link"]:
+                department_links[department["name"]] = department["link"]
+            else:
+                logger.error(f"Error getting department link: {department}")
+
+        return department_links
+
+    def scrape_courses(self, department_name: str) -> None:
+        try:
+            courses = self.extract_rows(f"{self.COURSE_TAG}.{self.COURSE_CLASS}", {"text": None})
+            for course in courses:
+                parsed = self.parse_course(department_name, course["text"] or "")
+                if parsed:
+                    self.add_course(department_name, parsed["course_tag"], parsed["course_name"])
+        except Exception as e:
+            logger.error(f"Error scraping courses for {department_name}: {e}")
+
+    def scrape_department(self, i: int, name: str, link: str, total: int) -> None:
+        logger.info(f"Scraping department: {name} ({i}/{total})")
+        self.driver.get(link)
+        self.scrape_courses(name)
+        self.complete_department(name)
+
+        courses_count = len(self.department_courses.get(name, []))
+        logger.info(f"Scraped {courses_count} courses for {name}")
+
+    def run_selenium(self) -> Dict[str, List[Dict[str, str]]]:
+        try:
+            self.driver.get(self.BASE_URL)
+
+            # get links
+            department_links = self.get_department_links()
+
+            pending = self.pending_departments(list(department_links.items()), lambda department: department[0])
+            total = len(pending)
+            work_items = [(i, name, link) for i, (name, link) in enumerate(pending, 1)]
+            self.run_work_queue(work_items, lambda item: self.scrape_department(*item, total),
+                                describe=lambda item: f"Department {item[1]}")
+
+            return self.department_courses
+        except Exception as e:
+            logger.error(f"Error in run: {e}")
+            return {}
@@ -0,0 +1,33 @@
+from typing import Any
+
+import lxml.html
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml builds trees several times faster than html.parser; with a SoupStrainer
+# only the matching subtrees are materialised, which keeps peak memory down on
+# catalogue pages that run to megabytes
+PARSER = 'lxml'
+
+
+def strained_soup(html: str, name: Any = None, attrs: Any = None, **kwargs) -> BeautifulSoup:
+    """Parse only the elements matching a SoupStrainer(name, attrs, **kwargs) and their descendants.
+
+    e.g. strained_soup(html, 'div', class_='courseblock')
+    """
+    return BeautifulSoup(html, PARSER, parse_only=SoupStrainer(name, attrs or {}, **kwargs))
+
+
+def lxml_document(html: str) -> lxml.html.HtmlElement:
+    """Parse html with lxml directly, for pages large enough that even a strained soup is too slow."""
+    return lxml.html.fromstring(html)
+
+
+def stripped_text(element: lxml.html.HtmlElement) -> str:
+    """Equivalent of BeautifulSoup's get_text(strip=True) for an lxml element."""
+    return ''.join(text.strip() for text in element.itertext())
+
+
+def inner_text(element: lxml.html.HtmlElement) -> str:
+    """An element's text with whitespace collapsed, close to what Selenium's innerText returns."""
+    return ' '.join(element.text_content().split())
+
@@ -1,111 +1,207 @@
+import json
 from typing import Tuple
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest, FetchResult
+from .parsing import strained_soup
 
-import requests
-from bs4 import BeautifulSoup
+def unique_courses(courses: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Courses in order with repeats of a course tag dropped; FOSE lists a course once per section."""
+    seen = set()
+    unique = []
+    for course in courses:
+        if course['course_tag'] not in seen:
+            seen.add(course['course_tag'])
+            unique.append(course)
+    return unique
 
 class QueensScraper(BaseScraper):
     BASE_URL = "https://www.queensu.ca/academic-calendar/course-search/"
     API_URL = "https://www.queensu.ca/academic-calendar/course-search/api/"
+    SRCDB = '2024'  # Current academic year
+    use_http_cache = True
+
+    # "http" pulls the whole term in one FOSE search with empty criteria and
+    # groups it by subject locally; "subjects" sends one search per subject,
+    # as a fallback; "verify" does both and logs where they disagree
+    default_backend = "http"
     
-    def __init__(self, headless: bool = True):
-        super().__init__(headless=headless, timeout=5)
+    def __init__(self, headless: bool = True, backend: Optional[str] = None):
+        # The whole-term search returns every section of the year in one response
+        super().__init__(headless=headless, timeout=30, backend=backend)
         self.university_name = "Queens University"
-        self.session = requests.Session()
         
     def setup_driver(self):
         pass
         
-    def cleanup(self):
-        pass
-        
     def get_department_options(self) -> List[Tuple[str, str]]:
         try:
-            response = self.session.get(self.BASE_URL, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            subject_select = soup.find('select', {'id': 'crit-subject'})
-            
-            subjects = []
-            if subject_select:
-                for option in subject_select.find_all('option'):
-                    value = option.get('value', '').strip()
-                    text = option.get_text().strip()
-                    if value and value != '':
-                        subjects.append((value, text))
+            response = self.fetch(FetchRequest(self.BASE_URL))
+            if not response.ok:
+                logger.error(f"Error getting subjects: {response.error or response.status}")
+                return []
             
+            subjects = self.parse_subject_options(response.text)
             logger.info(f"Found {len(subjects)} subjects to scrape")
             return subjects
             
         except Exception as e:
             logger.error(f"Error getting subjects: {e}")
             return []
+
+    def parse_subject_options(self, html: str) -> List[Tuple[str, str]]:
+        soup = strained_soup(html, 'select', id='crit-subject')
+        subject_select = soup.find('select', {'id': 'crit-subject'})
+        
+        subjects = []
+        if subject_select:
+            for option in subject_select.find_all('option'):
+                value = option.get('value', '').strip()
+                text = option.get_text().strip()
+                if value and value != '':
+                    subjects.append((value, text))
+        return subjects
+
+    def search_request(self, subject_code: Optional[str] = None) -> FetchRequest:
+        """FOSE search for one subject, or for the whole term when subject_code is None."""
+        params = {
+            'page': 'fose',
+            'route': 'search'
+        }
+        
+        data = {
+            'other': {
+                'srcdb': self.SRCDB,
+                'keyword': '',
+                'subject': subject_code or ''
+            },
+            'criteria': [
+                {
+                    'field': 'subject',
+                    'value': subject_code
+                }
+            ] if subject_code else []
+        }
+        
+        return FetchRequest(
+            self.API_URL,
+            method='POST',
+            params=params,
+            json=data,
+            headers={
+                'Content-Type': 'application/json',
+                'Referer': self.BASE_URL
+            },
+            key=subject_code or 'all'
+        )
+
+    def parse_search_results(self, subject_code: str, response: FetchResult,
+                             department: Optional[str] = None) -> List[Dict[str, str]]:
+        if response.status != 200:
+            logger.warning(f"API request failed for subject {subject_code}: {response.error or response.status}")
+            return []
+        
+        try:
+            # Results that hash the same as last run reuse their previously parsed courses
+            return self.parse_department_if_changed(department or subject_code, response.text, self.parse_search_json)
+        except ValueError:
+            logger.warning(f"Invalid JSON response for subject {subject_code}")
+            return []
+
+    def parse_search_json(self, text: str) -> List[Dict[str, str]]:
+        json_data = json.loads(text)
+        courses = []
+        
+        # Extract courses from API response
+        if 'results' in json_data:
+            for result in json_data['results']:
+                course_code = result.get('code', '')
+                course_title = result.get('title', '')
+                
+                if course_code and course_title:
+                    courses.append({
+                        'course_tag': course_code.strip(),
+                        'course_name': course_title.strip()
+                    })
+        
+        # Shared by the whole-term and per-subject searches so both yield the same courses
+        return unique_courses(courses)
     
     def search_courses_for_subject(self, subject_code: str) -> List[Dict[str, str]]:
         try:
-            # Make API request to search for courses
-            params = {
-                'page': 'fose',
-                'route': 'search'
-            }
-            
-            data = {
-                'other': {
-                    'srcdb': '2024',  # Current academic year
-                    'keyword': '',
-                    'subject': subject_code
-                },
-                'criteria': [
-                    {
-                        'field': 'subject',
-                        'value': subject_code
-                    }
-                ]
-            }
-            
-            response = self.session.post(
-                self.API_URL,
-                params=params,
-                json=data,
-                timeout=self.timeout,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Referer': self.BASE_URL
-                }
-            )
-            
-            if response.status_code == 200:
-                try:
-                    json_data = response.json()
-                    courses = []
-                    
-                    # Extract courses from API response
-                    if 'results' in json_data:
-                        for result in json_data['results']:
-                            course_code = result.get('code', '')
-                            course_title = result.get('title', '')
-                            
-                            if course_code and course_title:
-                                courses.append({
-                                    'course_tag': course_code.strip(),
-                                    'course_name': course_title.strip()
-                                })
-                    
-                    return courses
-                    
-                except ValueError:
-                    logger.warning(f"Invalid JSON response for subject {subject_code}")
-                    return []
-            else:
-                logger.warning(f"API request failed for subject {subject_code}: {response.status_code}")
-                return []
-                
+            return self.parse_search_results(subject_code, self.fetch(self.search_request(subject_code)))
         except Exception as e:
             logger.error(f"Error searching courses for subject {subject_code}: {e}")
             return []
     
+    def scrape_subject(self, subject_code: str, subject_name: str) -> None:
+        logger.info(f"Processing subject: {subject_name} ({subject_code})")
+        
+        response = self.fetch_or_requeue(self.search_request(subject_code))
+        courses = self.parse_search_results(subject_code, response, subject_name)
+        
+        if courses:
+            self.add_courses(subject_name, courses)
+            self.complete_department(subject_name)
+            logger.info(f"Found {len(courses)} courses for {subject_name}")
+        else:
+            logger.warning(f"No courses found for {subject_name}")
+    
+    def group_by_subject(self, text: str, subject_names: Dict[str, str]) -> Dict[str, List[Dict[str, str]]]:
+        """Split a whole-term search into subjects, keyed by subject name like the per-subject searches."""
+        json_data = json.loads(text)
+        if json_data.get('fatal'):
+            raise ValueError(json_data['fatal'])
+        departments: Dict[str, List[Dict[str, str]]] = {}
+        unmapped: Dict[str, int] = {}
+        for course in self.parse_search_json(text):
+            subject_code = course['course_tag'].split()[0]
+            if subject_code not in subject_names:
+                # Not in the subject dropdown, so the per-subject searches would never return it either
+                unmapped[subject_code] = unmapped.get(subject_code, 0) + 1
+                continue
+            departments.setdefault(subject_names[subject_code], []).append(course)
+        if unmapped:
+            logger.warning(f"Dropped {sum(unmapped.values())} courses with subject codes missing from the "
+                           f"subject list: {', '.join(sorted(unmapped))}")
+        return departments
+
+    def scrape_catalogue(self, subject_names: Dict[str, str]) -> Dict[str, List[Dict[str, str]]]:
+        """Fetch every course of the term in one search and group it by subject."""
+        response = self.fetch(self.search_request())
+        if not response.ok:
+            raise RuntimeError(f"Whole-term search failed: {response.error or response.status}")
+        # An unchanged result reuses last run's subjects without parsing
+        departments = self.parse_if_changed(self.API_URL, response.text,
+                                            lambda text: self.group_by_subject(text, subject_names))
+        logger.info(f"Whole-term search returned {sum(len(courses) for courses in departments.values())} courses "
+                    f"in {len(departments)} subjects")
+        return departments
+
+    def scrape_subjects(self, departments: List[Tuple[str, str]]) -> None:
+        departments = self.pending_departments(departments, lambda department: department[1])
+        
+        # Subject searches are sent concurrently under the per-host rate limit
+        self.run_work_queue(departments, lambda department: self.scrape_subject(*department),
+                            describe=lambda department: f"Subject {department[1]}")
+
+    def verify(self, catalogue: Dict[str, List[Dict[str, str]]], departments: List[Tuple[str, str]]) -> None:
+        """Compare the whole-term result with one search per subject and log every subject that differs."""
+        responses = self.fetch_all([self.search_request(subject_code) for subject_code, _ in departments])
+        mismatches = 0
+        for (subject_code, subject_name), response in zip(departments, responses):
+            if not response.ok:
+                logger.warning(f"Verify: search for {subject_name} failed: {response.error or response.status}")
+                continue
+            expected = {course['course_tag'] for course in self.parse_search_json(response.text)}
+            actual = {course['course_tag'] for course in catalogue.get(subject_name, [])}
+            if expected != actual:
+                mismatches += 1
+                logger.warning(f"Verify: {subject_name} has {len(actual)} courses in the whole-term search, "
+                               f"{len(expected)} in its own; missing {sorted(expected - actual)[:5]}, "
+                               f"extra {sorted(actual - expected)[:5]}")
+        logger.info(f"Verify: {len(departments) - mismatches}/{len(departments)} subjects match")
+
     def run(self) -> Dict[str, List[Dict[str, str]]]:
         """Main method to scrape all courses from Queen's University"""
         logger.info(f"Starting scraping for {self.university_name}")
@@ -116,18 +212,24 @@ class QueensScraper(BaseScraper):
             if not departments:
                 logger.error("No subjects found, cannot proceed with scraping")
                 return {}
-            
-            for subject_code, subject_name in departments:
-                logger.info(f"Processing subject: {subject_name} ({subject_code})")
-                
-                # Use API to get courses
-                courses = self.search_courses_for_subject(subject_code)
-                
-                if courses:
-                    self.department_courses[subject_name] = courses
-                    logger.info(f"Found {len(courses)} courses for {subject_name}")
-                else:
-                    logger.warning(f"No courses found for {subject_name}")
+
+            if self.backend != "subjects":
+                try:
+                    catalogue = self.scrape_catalogue(dict(departments))
+                except Exception as e:
+                    logger.error(f"Whole-term search failed, searching each subject instead: {e}")
+                    catalogue = {}
+                if catalogue:
+                    if self.backend == "verify":
+                        self.verify(catalogue, departments)
+                    for subject_name, courses in catalogue.items():
+                        if not self.is_resumed(subject_name):
+                            self.add_courses(subject_name, courses)
+                            self.complete_department(subject_name)
+                    logger.info(f"Scraping completed. Found courses for {len(self.department_courses)} departments")
+                    return self.department_courses
+
+            self.scrape_subjects(departments)
             
             logger.info(f"Scraping completed. Found courses for {len(self.department_courses)} departments")
             return self.department_courses
@@ -135,9 +237,3 @@ class QueensScraper(BaseScraper):
         except Exception as e:
             logger.error(f"Error during scraping: {e}")
             return self.department_courses
-        
-        finally:
-            if hasattr(self.session, 'close'):
-                self.session.close()
-            
-            
@@ -0,0 +1,129 @@
+import email.utils
+import threading
+import time
+from typing import Dict, Optional
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateLimiter:
+    """AIMD rate limit for one host, tuned from the responses it sees.
+
+    Requests are spaced 1/rate seconds apart. Each successful response whose
+    latency stays within `latency_factor` times the best latency seen so far
+    adds `increase` requests per second, up to `max_rate`. A 429, a 5xx or a
+    timeout multiplies the rate by `decrease` (at most once a second), down
+    to `min_rate`, and a Retry-After header pauses the host for that long.
+    Slow but successful responses hold the rate where it is.
+    """
+
+    def __init__(self, host: str, rate: float, min_rate: Optional[float] = None, max_rate: Optional[float] = None,
+                 increase: Optional[float] = None, decrease: float = 0.5, latency_factor: float = 2.0,
+                 report_interval: float = 30.0):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.max_rate = max_rate or rate * 4
+        self.increase = increase or rate / 20
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.report_interval = report_interval
+
+        self.latency: Optional[float] = None
+        self.best_latency: Optional[float] = None
+        self.successes = 0
+        self.throttled = 0
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._reported = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim the next request slot and return how many seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + 1 / self.rate
+            return slot - now
+
+    def wait(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, latency: float, ok: bool, status: Optional[int] = None,
+               retry_after: Optional[float] = None) -> None:
+        """Feed back the outcome of a request: its latency, whether it succeeded, and any status."""
+        with self._lock:
+            if not ok and (status is None or status in THROTTLE_STATUSES):
+                self.throttled += 1
+                now = time.monotonic()
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                # Concurrent requests tend to fail together; count them as one congestion signal
+                if now - self._last_decrease < 1.0:
+                    return
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                # Requests already spaced for the old rate are pushed back too
+                self._next_slot = max(self._next_slot, time.monotonic() + 1 / self.rate)
+                reason = f"HTTP {status}" if status else "timeout or connection error"
+                pause = f", pausing {retry_after:.0f}s for Retry-After" if retry_after else ""
+                logger.warning(f"{self.host}: {reason}, backing off to {self.rate:.2f} req/s{pause}")
+                return
+
+            if not ok:
+                return
+            self.successes += 1
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+            if latency <= self.best_latency * self.latency_factor:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+            if time.monotonic() - self._reported >= self.report_interval:
+                self._reported = time.monotonic()
+                logger.info(self.describe())
+
+    def describe(self) -> str:
+        latency = f"latency {self.latency:.2f}s (best {self.best_latency:.2f}s)" if self.latency is not None else "no latency yet"
+        return (f"{self.host}: {self.rate:.2f} req/s, {latency}, "
+                f"{self.successes} ok, {self.throttled} throttled")
+
+
+class HostRateLimiters:
+    """One AdaptiveRateLimiter per host, created on first use with shared settings."""
+
+    def __init__(self, rate: float, **settings):
+        self.rate = rate
+        self.settings = settings
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> AdaptiveRateLimiter:
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = AdaptiveRateLimiter(host, self.rate, **self.settings)
+            return self._limiters[host]
+
+    def report(self) -> None:
+        for limiter in self._limiters.values():
+            logger.info(f"Final rate for {limiter.describe()}")
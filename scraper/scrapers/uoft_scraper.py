@@ -1,18 +1,123 @@
-from typing import Dict, List, Tuple, Optional, Any
+import json
+import os
 import time
-import random
+from typing import Dict, List, Tuple, Optional, Any
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
 from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+from .work_queue import RetryableError
+from scraped_files import DATA_DIR
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+# Records the fetch/XHR calls the directory app makes, with their response
+# bodies, so the data endpoint behind the department filter can be replayed
+CAPTURE_SCRIPT = """
+if (!window.__capturedRequests) {
+    window.__capturedRequests = [];
+    const record = (method, url, body, text) => {
+        try {
+            window.__capturedRequests.push({
+                method: (method || 'GET').toUpperCase(),
+                url: new URL(url, location.href).href,
+                body: typeof body === 'string' ? body : null,
+                text: typeof text === 'string' ? text : null
+            });
+        } catch (e) {}
+    };
+    const originalFetch = window.fetch;
+    window.fetch = async (input, init = {}) => {
+        const response = await originalFetch(input, init);
+        const url = typeof input === 'string' ? input : input.url;
+        const method = init.method || (typeof input === 'string' ? 'GET' : input.method);
+        response.clone().text().then(text => record(method, url, init.body, text)).catch(() => {});
+        return response;
+    };
+    const open = XMLHttpRequest.prototype.open;
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__capture = {method, url};
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function (body) {
+        this.addEventListener('load', () => record(this.__capture.method, this.__capture.url, body,
+            this.responseType === '' || this.responseType === 'text' ? this.responseText : null));
+        return send.apply(this, arguments);
+    };
+}
+"""
+
+# Field names tried, in order, when reading course records and paging parameters
+CODE_KEYS = ('code', 'courseCode', 'course_code', 'courseId', 'course_id')
+TITLE_KEYS = ('name', 'title', 'courseTitle', 'course_title', 'courseName', 'course_name')
+PAGE_KEYS = ('page', 'pageNumber', 'page_number', 'pageIndex', 'offset', 'start', 'skip', 'from')
+OFFSET_KEYS = ('offset', 'start', 'skip', 'from')
+SIZE_KEYS = ('pageSize', 'page_size', 'limit', 'size', 'perPage', 'per_page', 'rows', 'count')
+# Response fields tried, in order, for the number of records matching the query across all pages
+TOTAL_KEYS = ('total', 'totalCount', 'total_count', 'totalElements', 'totalResults', 'totalHits', 'numFound')
+
+
+def find_course_records(data: Any) -> List[Dict[str, Any]]:
+    """The largest list of objects in a JSON document that carry a course code and title."""
+    best: List[Dict[str, Any]] = []
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            records = [item for item in value if isinstance(item, dict)
+                       and any(item.get(key) for key in CODE_KEYS) and any(item.get(key) for key in TITLE_KEYS)]
+            if len(records) > len(best):
+                best = records
+            stack.extend(value)
+    return best
+
+
+def find_total(data: Any) -> Optional[int]:
+    """The total record count an API response reports, searching its objects breadth-first; None if it has none."""
+    queue = [data]
+    while queue:
+        value = queue.pop(0)
+        if not isinstance(value, dict):
+            continue
+        for key in TOTAL_KEYS:
+            total = value.get(key)
+            if isinstance(total, dict):
+                # e.g. Elasticsearch's {"hits": {"total": {"value": 1234}}}
+                total = total.get("value")
+            if isinstance(total, int) and not isinstance(total, bool):
+                return total
+        queue.extend(item for item in value.values() if isinstance(item, dict))
+    return None
+
+
+def first_key(fields: Dict[str, Any], candidates: Tuple[str, ...]) -> Optional[str]:
+    return next((key for key in candidates if key in fields), None)
+
+
 class UofTScraper(BaseScraper):
     BASE_URL = "https://uoftindex.ca/directory"
+    # Written whenever the Selenium backend runs; read by the HTTP backend
+    API_CAPTURE_PATH = os.path.join(DATA_DIR, "uoft_api.json")
+    API_PAGE_SIZE = 500
+    API_MAX_PAGES = 200
 
-    def __init__(self, headless: bool = True):
-        super().__init__(headless=headless, timeout=10)
+    # The directory is a Vue app over a JSON API. The default backend replays
+    # the API call captured from the app, and only launches Chrome (capturing
+    # the API again) when there is no capture or it stops returning courses
+    default_backend = "http"
+
+    def __init__(self, headless: bool = True, backend: Optional[str] = None):
+        super().__init__(headless=headless, timeout=10, backend=backend)
         self.university_name = "University of Toronto"
+        # Department whose filter checkbox is currently ticked
+        self.selected_department: Optional[Any] = None
+        self.api: Optional[Dict[str, Any]] = None
+        # Departments whose replayed course count disagrees with the API's total or the capture's sample
+        self.mismatched_departments: List[str] = []
         
     def get_department_options(self) -> List[Tuple[str, str]]:
         try:
@@ -25,7 +130,7 @@ class UofTScraper(BaseScraper):
                 )
             )
             field_of_study_button.click()
-            time.sleep(2)
+            self.wait_for_count_stable('.v-list-item.v-list-item--link')
             
             department_elements = self.wait.until(
                 EC.presence_of_all_elements_located(
@@ -33,18 +138,17 @@ class UofTScraper(BaseScraper):
                 )
             )
             
+            # Titles are read in one round trip, in the same document order as the elements
+            titles = self.extract_rows('.v-list-item.v-list-item--link', {"title": ".v-list-item__title.pr-2"})
+            
             departments = []
-            for element in department_elements:
-                try:
-                    title_element = element.find_element(By.CSS_SELECTOR, '.v-list-item__title.pr-2')
-                    department_name = title_element.text.strip()
-                    
-                    if department_name:
-                        departments.append((element, department_name))
-                        
-                except Exception as e:
-                    logger.error(f"Failed to parse department: {e}")
-                    continue
+            for element, row in zip(department_elements, titles):
+                department_name = row["title"]
+                
+                if department_name:
+                    departments.append((element, department_name))
+                else:
+                    logger.error("Failed to parse department: missing title")
             
             logger.info(f"Found {len(departments)} departments")
             return departments
@@ -53,126 +157,98 @@ class UofTScraper(BaseScraper):
             logger.error(f"Failed to get departments: {e}")
             return []
 
-    def scrape_courses(self, course_elements: List) -> List[Dict[str, str]]:
+    def scrape_courses(self, container_selector: str) -> List[Dict[str, str]]:
+        # Read every course on the page in one round trip, trying the code and
+        # title selectors in order of preference inside each container
+        course_rows = self.extract_rows(container_selector, {
+            "code": ['h3.courseTitle.courseCode', 'h3[class*="courseCode"]', 'h3'],
+            "name": ['h4.courseTitle', 'h4[class*="courseTitle"]', 'h4']
+        })
+        
         department_courses = []
-        for course_container in course_elements:
-            try:
-                # Try multiple selectors for course code
-                h3_element = None
-                for selector in ['h3.courseTitle.courseCode', 'h3[class*="courseCode"]', 'h3']:
-                    try:
-                        h3_element = course_container.find_element(By.CSS_SELECTOR, selector)
-                        break
-                    except:
-                        continue
-                
-                if not h3_element:
-                    continue
-                    
-                course_code_text = h3_element.text.strip()
-                course_tag = course_code_text.split()[0] if course_code_text else ""
-                
-                if not course_tag:
-                    continue
-                
-                h4_element = None
-                for selector in ['h4.courseTitle', 'h4[class*="courseTitle"]', 'h4']:
-                    try:
-                        h4_element = course_container.find_element(By.CSS_SELECTOR, selector)
-                        break
-                    except:
-                        continue
-                
-                if not h4_element:
-                    continue
-                    
-                course_name = h4_element.text.strip()
-                
-                if course_name:
-                    department_courses.append({
-                        "course_tag": course_tag,
-                        "course_name": course_name
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Failed to scrape course: {e}")
-                continue
+        for row in course_rows:
+            course_code_text = row["code"] or ""
+            course_tag = course_code_text.split()[0] if course_code_text else ""
+            course_name = row["name"] or ""
+            
+            if course_tag and course_name:
+                department_courses.append({
+                    "course_tag": course_tag,
+                    "course_name": course_name
+                })
                 
         return department_courses
 
-    def scrape_department(self, department_element: Any, department_name: str, max_retries: int = 2) -> None:
-        retry_count = 0
+    def scrape_department(self, department_element: Any, department_name: str) -> None:
+        """Select a department in the filter and read every results page.
+
+        Timeouts propagate so the work queue can retry the department later.
+        """
+        logger.info(f"Scraping {department_name}")
         
-        while retry_count < max_retries:
-            try:
-                logger.info(f"Scraping {department_name}")
-                
-                # Click on the department to select it
-                self.driver.execute_script("arguments[0].click();", department_element)
-                time.sleep(1)  # Wait for selection
-                
-                # Click outside the dropdown to close it
-                body = self.driver.find_element(By.TAG_NAME, "body")
-                self.driver.execute_script("arguments[0].click();", body)
-                time.sleep(2)
-                
-                all_courses = []
-                page_number = 1
-                
-                while True:
-                    # Try multiple selectors for course containers
-                    course_elements = []
-                    selectors = [
-                        'div.col.hover.py-2.pl-0',
-                        '.course-container', 
-                        '.course-item',
-                        'div[data-v-e58d897e]',
-                        'div.col'
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            course_elements = self.wait.until(
-                                EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
-                            )
-                            if course_elements:
-                                break
-                        except TimeoutException:
-                            continue
-                    
-                    if not course_elements:
-                        break
-                    
-                    courses = self.scrape_courses(course_elements)
-                    all_courses.extend(courses)
-              
-                    next_page = self.find_next_page()
-                    if next_page:
-                        self.driver.execute_script("arguments[0].click();", next_page)
-                        time.sleep(2)
-                        page_number += 1
-                    else:
+        # Clear the previous department's filter, which may belong to a failed attempt
+        if self.selected_department is not None:
+            self.driver.execute_script("arguments[0].click();", self.selected_department)
+            self.selected_department = None
+            self.wait_for_dom_idle()
+        
+        # Click on the department to select it
+        self.driver.execute_script("arguments[0].click();", department_element)
+        self.selected_department = department_element
+        self.wait_for_dom_idle()  # Wait for selection
+        
+        # Click outside the dropdown to close it, then let the filtered list render
+        body = self.driver.find_element(By.TAG_NAME, "body")
+        self.driver.execute_script("arguments[0].click();", body)
+        self.wait_for_dom_idle(quiet_period=0.5)
+        
+        if self.api is None:
+            self.capture_api(department_name)
+        
+        all_courses = []
+        page_number = 1
+        
+        while True:
+            # Try multiple selectors for course containers
+            course_elements = []
+            container_selector = None
+            selectors = [
+                'div.col.hover.py-2.pl-0',
+                '.course-container', 
+                '.course-item',
+                'div[data-v-e58d897e]',
+                'div.col'
+            ]
+            
+            for selector in selectors:
+                try:
+                    course_elements = self.wait.until(
+                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
+                    )
+                    if course_elements:
+                        container_selector = selector
                         break
-                
-                if all_courses:
-                    if department_name in self.department_courses:
-                        self.department_courses[department_name].extend(all_courses)
-                    else:
-                        self.department_courses[department_name] = all_courses
-                
-                logger.info(f"Found {len(all_courses)} courses in {department_name}")
-                break  # Successfully scraped this department
-                
-            except TimeoutException:
-                retry_count += 1
-                if retry_count >= max_retries:
-                    logger.error(f"Failed to scrape {department_name} after {max_retries} retries")
-                    break
-                logger.warning(f"Timeout, retrying {department_name} ({retry_count}/{max_retries})")
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"Failed to scrape {department_name}: {e}")
+                except TimeoutException:
+                    continue
+            
+            if not course_elements:
+                break
+            
+            courses = self.scrape_courses(container_selector)
+            all_courses.extend(courses)
+      
+            next_page = self.find_next_page()
+            if next_page:
+                previous_page = self.result_fingerprint(container_selector)
+                self.driver.execute_script("arguments[0].click();", next_page)
+                self.wait_for_results_change(container_selector, previous_page)
+                page_number += 1
+            else:
                 break
+        
+        # Courses are only kept once every page is read, so a retried department is not duplicated
+        self.add_courses(department_name, all_courses)
+        logger.info(f"Found {len(all_courses)} courses in {department_name}")
 
     def find_next_page(self) -> Optional[Any]:
         try:
@@ -206,30 +282,192 @@ class UofTScraper(BaseScraper):
             logger.error(f"Failed to find next page: {e}")
             return None
     
-    def run(self) -> Dict[str, List[Dict[str, str]]]:
+    def capture_api(self, department_name: str) -> None:
+        """Find the recorded API call that returned this department's courses and keep it for the HTTP backend."""
+        captured = self.driver.execute_script("return (window.__capturedRequests || []).splice(0);") or []
+        for entry in reversed(captured):
+            api = self.api_from_request(entry, department_name)
+            if api is not None:
+                self.api = api
+                logger.info(f"Captured UofT course API: {api['method']} {api['url']} "
+                            f"(department field {api['department_field']!r}, page field {api['page_field']!r})")
+                return
+
+    def api_from_request(self, entry: Dict[str, Any], department_name: str) -> Optional[Dict[str, Any]]:
+        """Describe a recorded request as a replayable API call, if it filtered courses by department_name."""
+        try:
+            data = json.loads(entry.get("text") or "")
+            body = json.loads(entry["body"]) if entry.get("body") else None
+        except ValueError:
+            return None
+        if not find_course_records(data):
+            return None
+
+        parts = urlsplit(entry["url"])
+        locations = {"params": dict(parse_qsl(parts.query)), "json": body if isinstance(body, dict) else None}
+        for location, fields in locations.items():
+            if not fields:
+                continue
+            for key, value in fields.items():
+                if value == department_name or (isinstance(value, list) and department_name in value):
+                    page_field = first_key(fields, PAGE_KEYS)
+                    return {
+                        "url": urlunsplit(parts._replace(query='')),
+                        "method": entry["method"],
+                        "params": locations["params"],
+                        "json": locations["json"],
+                        "location": location,
+                        "department_field": key,
+                        "department_is_list": isinstance(value, list),
+                        "page_field": page_field,
+                        "first_page": int(fields[page_field]) if page_field and str(fields[page_field]).isdigit() else 0,
+                        "size_field": first_key(fields, SIZE_KEYS)
+                    }
+        return None
+
+    def save_api(self, department_names: List[str]) -> None:
+        # The Selenium counts let a replay that finds fewer courses, and whose API reports no total, be caught
+        course_counts = {name: len(courses) for name, courses in self.department_courses.items()}
+        capture = {**self.api, "departments": department_names, "course_counts": course_counts,
+                   "captured_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        try:
+            os.makedirs(os.path.dirname(self.API_CAPTURE_PATH), exist_ok=True)
+            partial_path = f"{self.API_CAPTURE_PATH}.partial"
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump(capture, f, indent=2, ensure_ascii=False)
+            os.replace(partial_path, self.API_CAPTURE_PATH)
+            logger.info(f"Saved UofT API capture to {self.API_CAPTURE_PATH}")
+        except OSError as e:
+            logger.error(f"Could not save UofT API capture: {e}")
+
+    def load_api(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.API_CAPTURE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.error(f"Ignoring unreadable UofT API capture: {e}")
+            return None
+
+    def api_request(self, api: Dict[str, Any], department_name: str, position: int) -> FetchRequest:
+        """The captured API call for one department, at a page number or record offset."""
+        fields = dict(api[api["location"]])
+        fields[api["department_field"]] = [department_name] if api["department_is_list"] else department_name
+        if api["size_field"]:
+            fields[api["size_field"]] = self.API_PAGE_SIZE
+        if api["page_field"]:
+            fields[api["page_field"]] = api["first_page"] + position
+
+        params, body = api["params"], api["json"]
+        if api["location"] == "params":
+            params = fields
+        else:
+            body = fields
+        return FetchRequest(api["url"], method=api["method"], params=params or None, json=body, key=department_name)
+
+    def course_from_record(self, record: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        code = next((str(record[key]) for key in CODE_KEYS if record.get(key)), "")
+        name = next((str(record[key]) for key in TITLE_KEYS if record.get(key)), "")
+        # Same tag as the Selenium backend: the first word of the course code heading
+        course_tag = code.split()[0] if code.split() else ""
+        if course_tag and name.strip():
+            return {"course_tag": course_tag, "course_name": name.strip()}
+        return None
+
+    def scrape_department_api(self, api: Dict[str, Any], department_name: str) -> bool:
+        """Page through the API for one department with large pages. Returns whether it had any courses.
+
+        The records read are checked against the total the API reports or,
+        failing that, the course count the Selenium backend saw when the API
+        was captured. A department that comes up short is left out and noted
+        in mismatched_departments rather than imported incomplete.
+        """
+        courses = []
+        fetched = 0
+        previous_first = None
+        reported_total = None
+        for page in range(self.API_MAX_PAGES):
+            position = fetched if api["page_field"] in OFFSET_KEYS else page
+            response = self.fetch_or_requeue(self.api_request(api, department_name, position))
+            if not response.ok:
+                raise RuntimeError(f"API request failed: {response.error or response.status}")
+            try:
+                data = response.json()
+            except ValueError:
+                raise RetryableError("API returned invalid JSON")
+            records = find_course_records(data)
+            if reported_total is None:
+                reported_total = find_total(data)
+
+            # Stop on an empty page, or when the server ignores the page field and repeats itself
+            if not records or records[0] == previous_first:
+                break
+            previous_first = records[0]
+            fetched += len(records)
+            courses.extend(course for course in map(self.course_from_record, records) if course)
+            if not api["page_field"] or (api["size_field"] and len(records) < self.API_PAGE_SIZE):
+                break
+
+        if reported_total is not None and fetched != reported_total:
+            self.mismatched_departments.append(department_name)
+            logger.warning(f"Replay of {department_name} read {fetched} records but the API reports {reported_total}")
+            return False
+        sample = api.get("course_counts", {}).get(department_name)
+        if reported_total is None and sample is not None and len(courses) < sample:
+            self.mismatched_departments.append(department_name)
+            logger.warning(f"Replay of {department_name} found {len(courses)} courses, "
+                           f"fewer than the {sample} seen when the API was captured")
+            return False
+
+        self.add_courses(department_name, courses)
+        self.complete_department(department_name)
+        logger.info(f"Found {len(courses)} courses in {department_name}")
+        return bool(courses)
+
+    def run_http(self) -> Dict[str, List[Dict[str, str]]]:
+        api = self.load_api()
+        if api is None:
+            logger.warning(f"No UofT API capture at {self.API_CAPTURE_PATH}; the Selenium backend will record one")
+            return {}
+        logger.info(f"Using UofT API capture from {api.get('captured_at')}: {api['method']} {api['url']}")
+
+        departments = self.pending_departments(api["departments"], lambda department_name: department_name)
+        results = self.run_work_queue(departments, lambda department_name: self.scrape_department_api(api, department_name),
+                                      describe=lambda department_name: f"Department {department_name}")
+        logger.info(f"Successfully scraped {sum(1 for found in results if found)}/{len(departments)} departments")
+        if self.mismatched_departments:
+            # The replay rests on guessed field names and paging, so a short count means the catalogue may be truncated
+            raise RuntimeError(f"API replay came up short for {len(self.mismatched_departments)} departments, "
+                               f"e.g. {', '.join(self.mismatched_departments[:5])}")
+        # A capture that no longer returns courses sends the run to the Selenium fallback
+        return self.department_courses if any(results) or not departments else {}
+
+    def run_selenium(self) -> Dict[str, List[Dict[str, str]]]:
         try:
             self.driver.get(self.BASE_URL)
+            self.driver.execute_script(CAPTURE_SCRIPT)
             departments = self.get_department_options()
             
             if not departments:
                 logger.warning("No departments found")
                 return {}
+            department_names = [department_name for _, department_name in departments]
+            departments = self.pending_departments(departments, lambda department: department[1])
             
-            previous_department_element = None
-            
-            for i, (department_element, department_name) in enumerate(departments, 1):
-                try:
-                    if previous_department_element is not None:
-                        self.driver.execute_script("arguments[0].click();", previous_department_element)
-                        time.sleep(1)
-                    
+            def scrape_item(item: Tuple[Any, str]) -> None:
+                department_element, department_name = item
+                with self.paced(self.BASE_URL):
                     self.scrape_department(department_element, department_name)
-                    previous_department_element = department_element
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process {department_name}: {e}")
-                    continue
+                self.complete_department(department_name)
+            
+            # Departments are filters on one page, so they are scraped in order on a single driver
+            self.run_work_queue(departments, scrape_item, describe=lambda item: f"Department {item[1]}", workers=1)
+            
+            if self.api is not None:
+                self.save_api(department_names)
+            else:
+                logger.warning("Did not find the UofT course API among the app's requests")
             
             total_courses = sum(len(courses) for courses in self.department_courses.values())
             logger.info(f"Completed: {len(self.department_courses)} departments, {total_courses} courses")
@@ -237,4 +475,4 @@ class UofTScraper(BaseScraper):
             
         except Exception as e:
             logger.error(f"Failed to run scraper: {e}")
-            return {} 
\ No newline at end of file
+            return {}
@@ -1,78 +1,175 @@
-from typing import Dict, List
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import lxml.etree
+
 from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+from .parsing import lxml_document, stripped_text
+
+
+# Column headings, lower-cased, that mark the course table's header row among the page's tables
+SCHEDULE_HEADINGS = ('subject', 'title')
+
+
+def is_schedule_header(cells: List[lxml.etree._Element]) -> bool:
+    texts = [stripped_text(cell).lower() for cell in cells]
+    return all(any(heading in text for text in texts) for heading in SCHEDULE_HEADINGS)
+
+
+def iter_schedule_rows(chunks: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+    """(department, code, title) for each row of the schedule's course table, parsed as chunks arrive.
+
+    The course table is the first one with a row headed by SCHEDULE_HEADINGS;
+    the rows after that header are courses. Open tables are kept on a stack,
+    so rows of a table nested in another are credited to the inner one.
+    Only the row being read is kept in memory: each <tr> is cleared once its
+    cells have been read and dropped from its table after the next one.
+    """
+    parser = lxml.etree.HTMLPullParser(events=('start', 'end'), tag=('table', 'tr'))
+    # One entry per open table: whether it is the course table and its header has been read
+    open_tables: List[bool] = []
+    found = False
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if element.tag == 'table':
+                if event == 'start':
+                    open_tables.append(False)
+                elif open_tables:
+                    open_tables.pop()
+                continue
+            if event != 'end' or not open_tables:
+                continue
+
+            cells = element.xpath('./td|./th')
+            if open_tables[-1]:
+                if len(cells) >= 3:
+                    yield stripped_text(cells[0]), stripped_text(cells[1]), stripped_text(cells[2])
+            elif not found and is_schedule_header(cells):
+                open_tables[-1] = found = True
+            # Rows already read are dropped; the current one is only emptied, as the parser may still refer to it
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    parser.close()
 
-import requests
-from bs4 import BeautifulSoup
 
 class WaterlooScraper(BaseScraper):
+    """Waterloo's schedule of classes: one multi-megabyte page listing every course in a table.
+
+    By default the page is streamed: rows are parsed as the download
+    progresses and discarded once read, so memory stays flat and parsing
+    overlaps the transfer. If streaming fails, the page is fetched whole
+    through the HTTP cache and parsed in one go.
+    """
     BASE_URL = "https://classes.uwaterloo.ca/uwpcshtm.html"
+    use_http_cache = True
+    stream_schedule = True
 
     def __init__(self, headless: bool = True):
-        super().__init__(headless=headless)
-        self.soup = None
+        super().__init__(headless=headless, timeout=30)
         self.university_name = "University of Waterloo"
         
     def setup_driver(self):
         pass
+
+    @staticmethod
+    def add_schedule_row(department_courses: Dict[str, List[Dict[str, str]]],
+                         department: str, code: str, title: str) -> None:
+        if not department or not code or not title:
+            return
+        department_courses.setdefault(department, []).append({
+            "course_tag": f"{department} {code}",
+            "course_name": title
+        })
+
+    def parse_schedule(self, html: str) -> Dict[str, List[Dict[str, str]]]:
+        # The page lists every course, so it is parsed with lxml directly rather than through a soup
+        document = lxml_document(html)
         
-    def cleanup(self):
-        pass
+        department_courses = {}
+        
+        course_rows = []
+        for table in document.xpath('//table'):
+            # Only the table's own rows, not those of tables nested in it
+            rows = table.xpath('./tr|./*/tr')
+            header = next((i for i, row in enumerate(rows) if is_schedule_header(row.xpath('./td|./th'))), None)
+            if header is not None:
+                course_rows = rows[header:]
+                break
+        else:
+            logger.error("Course table not found")
+            return department_courses
+        
+        if len(course_rows) < 2:
+            logger.error("No course rows found")
+            return department_courses
+        
+        total = len(course_rows)
+        for i, course in enumerate(course_rows[1:], 1):
+            try:
+                if i % 1000 == 0:
+                    logger.info(f"Processing course {i}/{total}")
+                    
+                cells = course.xpath('./td|./th')
+                if len(cells) < 3:
+                    continue
+                    
+                self.add_schedule_row(department_courses, stripped_text(cells[0]),
+                                      stripped_text(cells[1]), stripped_text(cells[2]))
+            except Exception as e:
+                logger.error(f"Error processing course row: {e}")
+                continue
+                
+        return department_courses
+
+    def parse_schedule_stream(self) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """Stream and parse the schedule, recording its hash in the manifest. None if it had no course rows."""
+        digest = hashlib.sha256()
+
+        # The decoded text is hashed, as parse_if_changed does, so the streamed and buffered paths share manifest entries
+        def hashed(chunks: Iterable[str]) -> Iterator[str]:
+            for chunk in chunks:
+                digest.update(chunk.encode('utf-8'))
+                yield chunk
+
+        department_courses: Dict[str, List[Dict[str, str]]] = {}
+        rows = 0
+        for department, code, title in iter_schedule_rows(hashed(self.stream(FetchRequest(self.BASE_URL)))):
+            rows += 1
+            if rows % 1000 == 0:
+                logger.info(f"Processed {rows} courses")
+            self.add_schedule_row(department_courses, department, code, title)
+        if not rows:
+            return None
+
+        # Parsing already overlapped the download, so the hash only feeds the manifest and importer
+        manifest = self.get_manifest()
+        previous = manifest.previous_sources.get(self.BASE_URL, {})
+        manifest.record(self.BASE_URL, digest.hexdigest(), list(department_courses),
+                        previous.get("hash") == digest.hexdigest())
+        logger.info(f"Streamed {rows} courses in {len(department_courses)} departments")
+        return department_courses
 
     def run(self) -> Dict[str, List[Dict[str, str]]]:
+        if self.stream_schedule:
+            try:
+                departments = self.parse_schedule_stream()
+                if departments:
+                    return departments
+                logger.warning("Streamed schedule had no course rows, fetching it whole")
+            except Exception as e:
+                logger.error(f"Error streaming course schedule, fetching it whole: {e}")
+
         try:
-            source = requests.get(self.BASE_URL).text
-            self.soup = BeautifulSoup(source, 'html.parser')
+            response = self.fetch(FetchRequest(self.BASE_URL))
+            if not response.ok:
+                logger.error(f"Failed to fetch course schedule: {response.error or response.status}")
+                return {}
             
-            department_courses = {}
-            
-            tables = self.soup.find_all('table')
-            if len(tables) < 2:
-                logger.error("Course table not found")
-                return department_courses
-                
-            course_table = tables[1]
-            course_rows = course_table.find_all('tr')
-            
-            if len(course_rows) < 2:
-                logger.error("No course rows found")
-                return department_courses
-            
-            total = len(course_rows)
-            for i, course in enumerate(course_rows[1:], 1):
-                try:
-                    if i % 100 == 0:
-                        logger.info(f"Processing course {i}/{total}")
-                        
-                    cells = course.find_all('td')
-                    if len(cells) < 3:
-                        continue
-                        
-                    department = cells[0].get_text(strip=True)
-                    code = cells[1].get_text(strip=True)
-                    title = cells[2].get_text(strip=True)
-                    
-                    if not department or not code or not title:
-                        continue
-                        
-                    course_tag = f"{department} {code}"
-                    
-                    if department in department_courses:
-                        department_courses[department].append({
-                            "course_tag": course_tag,
-                            "course_name": title
-                        })
-                    else:
-                        department_courses[department] = [{
-                            "course_tag": course_tag,
-                            "course_name": title
-                        }]
-                except Exception as e:
-                    logger.error(f"Error processing course row: {e}")
-                    continue
-                    
-            return department_courses
+            # A schedule that hashes the same as last run reuses its previously parsed departments
+            return self.parse_if_changed(self.BASE_URL, response.text, self.parse_schedule)
         except Exception as e:
             logger.error(f"Error in run: {e}")
             return {}
-
-
@@ -0,0 +1,164 @@
+import contextlib
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, ContextManager, Deque, List, Optional, Tuple, Type
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RetryableError(Exception):
+    """Raised by a work item handler for a transient failure worth another attempt later."""
+
+
+class WorkQueue:
+    """Runs department-level work items across worker threads with retries.
+
+    A handler that raises one of `retryable` is requeued at the back of the
+    queue and becomes eligible again after an exponential backoff with
+    jitter, so the other departments keep flowing while it waits. Each item
+    gets at most `max_attempts`, and the whole run at most `retry_budget`
+    retries, so a site that is down fails fast instead of retrying every
+    department. Any other exception fails the item immediately.
+
+    `worker_context`, if given, is entered once per worker thread around all
+    the items it runs, e.g. to lease a browser from a pool. A worker whose
+    context fails to start drops out; if none start, every item fails.
+    """
+
+    def __init__(self, handler: Callable[[Any], Any], workers: int = 1, max_attempts: int = 3,
+                 retry_budget: Optional[int] = None, base_delay: float = 1.0, max_delay: float = 30.0,
+                 retryable: Tuple[Type[BaseException], ...] = (RetryableError,),
+                 worker_context: Optional[Callable[[], ContextManager]] = None,
+                 describe: Callable[[Any], str] = str):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_budget = retry_budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.worker_context = worker_context or contextlib.nullcontext
+        self.describe = describe
+        self.retries = 0
+        self.failed: List[Any] = []
+
+        # Entries are (index, item, attempt, not_before)
+        self._pending: Deque[Tuple[int, Any, int, float]] = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._results: List[Any] = []
+        self._budget = 0
+        self._workers_started = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the next attempt: half the exponential step fixed, half random."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def run(self, items: List[Any]) -> List[Any]:
+        """Process every item, returning handler results in item order (None for failed items)."""
+        items = list(items)
+        self._results = [None] * len(items)
+        self._pending = deque((index, item, 1, 0.0) for index, item in enumerate(items))
+        self.retries = 0
+        self.failed = []
+        # By default enough for a handful of flaky departments, not for retrying a whole site that is down
+        self._budget = self.retry_budget if self.retry_budget is not None else max(3, len(items) // 5)
+
+        workers = min(self.workers, len(items))
+        self._workers_started = max(1, workers)
+        if workers <= 1:
+            self._work()
+        else:
+            threads = [threading.Thread(target=self._work, name=f"work-queue-{i}", daemon=True)
+                       for i in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if self.retries or self.failed:
+            logger.info(f"Work queue finished {len(items) - len(self.failed)}/{len(items)} items "
+                        f"with {self.retries} retries")
+        return self._results
+
+    def _next(self) -> Optional[Tuple[int, Any, int]]:
+        """Take the first item whose backoff has elapsed, waiting if every pending item is backing off."""
+        with self._condition:
+            while True:
+                if not self._pending:
+                    if self._in_flight == 0:
+                        return None
+                    # A running item may still be requeued
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                for position, (index, item, attempt, not_before) in enumerate(self._pending):
+                    if not_before <= now:
+                        del self._pending[position]
+                        self._in_flight += 1
+                        return index, item, attempt
+                self._condition.wait(min(entry[3] for entry in self._pending) - now)
+
+    def _finish(self, entry: Optional[Tuple[int, Any, int, float]] = None) -> None:
+        with self._condition:
+            if entry is not None:
+                self._pending.append(entry)
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _work(self) -> None:
+        try:
+            context = self.worker_context()
+            context.__enter__()
+        except Exception as e:
+            logger.error(f"Could not start work queue worker: {e}")
+            self._worker_failed()
+            return
+        try:
+            while True:
+                taken = self._next()
+                if taken is None:
+                    return
+                index, item, attempt = taken
+                self._finish(self._attempt(index, item, attempt))
+        finally:
+            context.__exit__(None, None, None)
+
+    def _worker_failed(self) -> None:
+        """Account for a worker whose context failed; once none are left, the items still queued fail."""
+        with self._condition:
+            self._workers_started -= 1
+            if self._workers_started == 0 and self._pending:
+                abandoned = [item for _, item, _, _ in self._pending]
+                self._pending.clear()
+                self.failed.extend(abandoned)
+                logger.error(f"No work queue worker could start, {len(abandoned)} items failed")
+            self._condition.notify_all()
+
+    def _attempt(self, index: int, item: Any, attempt: int) -> Optional[Tuple[int, Any, int, float]]:
+        """Run one attempt and return the entry to requeue, if any."""
+        try:
+            self._results[index] = self.handler(item)
+            return None
+        except self.retryable as e:
+            with self._condition:
+                can_retry = attempt < self.max_attempts and self.retries < self._budget
+                if can_retry:
+                    self.retries += 1
+            if can_retry:
+                delay = self.backoff(attempt)
+                logger.warning(f"{self.describe(item)} failed ({str(e) or type(e).__name__}), "
+                               f"requeued for attempt {attempt + 1}/{self.max_attempts} in {delay:.1f}s")
+                return index, item, attempt + 1, time.monotonic() + delay
+            reason = "retry budget exhausted" if attempt < self.max_attempts else f"after {attempt} attempts"
+            logger.error(f"{self.describe(item)} failed, {reason}: {str(e) or type(e).__name__}")
+        except Exception as e:
+            logger.error(f"{self.describe(item)} failed: {e}")
+        with self._condition:
+            self.failed.append(item)
+        return None
@@ -1,9 +1,10 @@
-from typing import Dict, List, Tuple
-import time
-import random
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
 from .base_scraper import BaseScraper, logger
+from .http_engine import FetchRequest
+from .work_queue import RetryableError
 
-import requests
+import lxml.html
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -17,13 +18,17 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 class YorkScraper(BaseScraper):
     BASE_URL = "https://w2prod.sis.yorku.ca/Apps/WebObjects/cdm"
+    COURSE_ROWS_XPATH = "//table//tr[@bgcolor='#ffffff' or @bgcolor='#e6e6e6']"
 
-    def __init__(self, headless: bool = True):
-        super().__init__(headless=headless, timeout=30)
+    # The CDM app is server-rendered HTML forms, so the default backend replays
+    # the form posts over HTTP; Chrome is only used if that fails
+    default_backend = "http"
+    max_concurrency_per_host = 1
+    requests_per_second = 2.0
+
+    def __init__(self, headless: bool = True, backend: Optional[str] = None):
+        super().__init__(headless=headless, timeout=30, backend=backend)
         self.university_name = "York University"
-        self.min_delay = 1
-        self.max_delay = 3
-        self.session = requests.Session()
 
     def setup_driver(self):
         options = Options()
@@ -78,17 +83,12 @@ class YorkScraper(BaseScraper):
             """
         })
 
-    def random_delay(self):
-        delay = random.uniform(self.min_delay, self.max_delay)
-        time.sleep(delay)
-
     def select_fall_winter_session(self):
         try:
             session_select = self.wait.until(
                 EC.presence_of_element_located((By.ID, "sessionSelect"))
             )
             Select(session_select).select_by_value("1")  # Value 1 corresponds to Fall/Winter
-            self.random_delay()
         except Exception as e:
             logger.error(f"Error selecting Fall/Winter session: {e}")
             raise
@@ -96,14 +96,12 @@ class YorkScraper(BaseScraper):
     def get_department_options(self) -> List[Tuple[str, str]]:
         try:
             self.driver.get(self.BASE_URL)
-            self.random_delay()
             
             subject_link = self.wait.until(
                 EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Subject')]"))
             )
             
-            subject_link.click()
-            self.random_delay()
+            self.wait_for_navigation(subject_link.click)
 
             # Select Fall/Winter session
             self.select_fall_winter_session()
@@ -120,12 +118,7 @@ class YorkScraper(BaseScraper):
                 EC.element_to_be_clickable((By.ID, "subjectSelect"))
             )
             
-            # # Additional wait to ensure all options are loaded
-            # self.random_delay()
-            
-            select = self.driver.find_element(By.ID, "subjectSelect")
-            
-            options = select.find_elements(By.TAG_NAME, "option")
+            options = self.extract_rows("#subjectSelect option", {"value": "@value", "text": None})
             
             if not options:
                 logger.error("No options found in select element")
@@ -133,8 +126,8 @@ class YorkScraper(BaseScraper):
                 
             result = []
             for option in options:
-                value = option.get_attribute('value')
-                text = option.text.strip()
+                value = option["value"]
+                text = option["text"]
                 if value and text:
                     # Extract department code from text (e.g., "ACTG - Accounting - ( SB, ED )" -> "ACTG")
                     dept_code = text.split(' - ')[0].strip()
@@ -159,149 +152,199 @@ class YorkScraper(BaseScraper):
             return []
 
     def scrape_department(self, value: str, department_code: str) -> None:
-        max_retries = 3
-        retry_delay = 2
-        
-        for attempt in range(max_retries):
+        """Search one subject in the browser. Timeouts propagate so the work queue can retry it."""
+        try:
+            select = self.wait.until(
+                EC.presence_of_element_located((By.ID, "subjectSelect"))
+            )
+            Select(select).select_by_value(value)
+            
+            search_button = self.wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "input[value='Search Courses']"))
+            )
+            self.wait_for_navigation(search_button.click)
+            
+            # Check if "No courses were found" message exists
             try:
-                select = self.wait.until(
-                    EC.presence_of_element_located((By.ID, "subjectSelect"))
-                )
-                Select(select).select_by_value(value)
-                self.random_delay()
-                
-                search_button = self.wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "input[value='Search Courses']"))
+                no_courses = self.driver.find_element(By.XPATH, "//*[contains(text(), 'No courses were found.')]")
+                if no_courses:
+                    logger.info(f"No courses found for department {department_code}, skipping...")
+                    return
+            except NoSuchElementException:
+                pass
+            
+            try:
+                self.wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "table tr[bgcolor='#ffffff'], table tr[bgcolor='#e6e6e6']"))
                 )
-                search_button.click()
-                self.random_delay()
-                
-                # Check if "No courses were found" message exists
-                try:
-                    no_courses = self.driver.find_element(By.XPATH, "//*[contains(text(), 'No courses were found.')]")
-                    if no_courses:
-                        logger.info(f"No courses found for department {department_code}, skipping...")
-                        return
-                except NoSuchElementException:
-                    pass
-                
-                try:
-                    self.wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "table tr[bgcolor='#ffffff'], table tr[bgcolor='#e6e6e6']"))
-                    )
-                except TimeoutException:
-                    if "No courses found" in self.driver.page_source:
-                        logger.info(f"No courses found for department {department_code}, skipping...")
-                        return
-                    raise
-                
-                # # Additional wait to ensure all content is loaded
-                # self.random_delay()
-                
-                course_rows = self.driver.find_elements(By.CSS_SELECTOR, "table tr[bgcolor='#ffffff'], table tr[bgcolor='#e6e6e6']")
-                
-                if not course_rows:
-                    logger.warning(f"No course rows found for department {department_code}, skipping...")
+            except TimeoutException:
+                if "No courses found" in self.driver.page_source:
+                    logger.info(f"No courses found for department {department_code}, skipping...")
                     return
+                raise
+            
+            # Parse the rendered page once offline with the same parser as the HTTP backend
+            document = lxml.html.fromstring(self.driver.page_source)
+            if not self.parse_course_rows(document, department_code):
+                logger.warning(f"No course rows found for department {department_code}, skipping...")
+        finally:
+            try:
+                self.driver.get(self.BASE_URL)
                 
-                # Process rows in batches for better performance
-                batch_size = 10
-                for i in range(0, len(course_rows), batch_size):
-                    batch = course_rows[i:i + batch_size]
-                    for row in batch:
-                        try:
-                            # Get the cells from the row
-                            cells = row.find_elements(By.TAG_NAME, "td")
-                            if len(cells) >= 2:
-                                # First cell contains course code and credits
-                                course_info = cells[0].text.strip()
-                                
-                                # Second cell contains course title
-                                course_title = cells[1].text.strip()
-                                
-                                # Extract course code from the first cell (e.g., "SB/ACTG 2010   3.00" -> "ACTG 2010")
-                                parts = course_info.split()
-                                if len(parts) >= 3:
-                                    # Get the department code and number (e.g., "ACTG 2010")
-                                    course_code = f"{parts[0].split('/')[-1]} {parts[1]}"  # Take last part after / and the number
-                                else:
-                                    course_code = ""
-                                
-                                if course_code and course_title:
-                                    self.add_course(department_code, course_code, course_title)
-                        except Exception as e:
-                            logger.error(f"Error parsing course row: {e}")
-                            continue
-                    
-                    # Small delay between batches
-                    if i + batch_size < len(course_rows):
-                        time.sleep(0.1)
+                subject_link = self.wait.until(
+                    EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Subject')]"))
+                )
                 
-                break
+                self.wait_for_navigation(subject_link.click)
+
+                # Select Fall/Winter session
+                self.select_fall_winter_session()
                 
-            except TimeoutException:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Timeout on attempt {attempt + 1} for department {department_code}, retrying...")
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    logger.error(f"Timeout waiting for courses to load for department {department_code} after {max_retries} attempts")
+                self.wait.until(
+                    EC.presence_of_element_located((By.ID, "subjectSelect"))
+                )
             except Exception as e:
-                logger.error(f"Error scraping department {department_code}: {e}")
-            finally:
-                try:
-                    self.driver.get(self.BASE_URL)
-                    self.random_delay()
-                    
-                    subject_link = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Subject')]"))
-                    )
-                    
-                    subject_link.click()
-                    self.random_delay()
-
-                    # Select Fall/Winter session
-                    self.select_fall_winter_session()
-                    
-                    self.wait.until(
-                        EC.presence_of_element_located((By.ID, "subjectSelect"))
-                    )
-                except Exception as e:
-                    logger.error(f"Error navigating back to subject page: {e}")
-
-    def run(self) -> Dict[str, List[Dict[str, str]]]:
+                logger.error(f"Error navigating back to subject page: {e}")
+
+    def fetch_document(self, request: FetchRequest) -> Optional[lxml.html.HtmlElement]:
+        response = self.fetch(request)
+        if not response.ok:
+            logger.error(f"Failed to load {request.url}: {response.error or response.status}")
+            return None
+        return lxml.html.fromstring(response.text, base_url=response.url)
+
+    def open_subject_form(self) -> Optional[lxml.html.FormElement]:
+        """Load the subject search page and return its form, mirroring the Selenium navigation."""
+        home = self.fetch_document(FetchRequest(self.BASE_URL))
+        if home is None:
+            return None
+
+        subject_links = home.xpath("//a[contains(text(), 'Subject')]/@href")
+        if not subject_links:
+            logger.error("Subject link not found on CDM home page")
+            return None
+
+        page = self.fetch_document(FetchRequest(urljoin(home.base_url, subject_links[0])))
+        if page is None:
+            return None
+
+        forms = page.xpath("//form[.//select[@id='subjectSelect']]")
+        if not forms:
+            logger.error("Subject search form not found")
+            return None
+        return forms[0]
+
+    def get_department_options_http(self) -> List[Tuple[str, str]]:
+        form = self.open_subject_form()
+        if form is None:
+            return []
+
+        result = []
+        for option in form.xpath(".//select[@id='subjectSelect']/option"):
+            value = option.get('value')
+            text = option.text_content().strip()
+            if value and text:
+                # Extract department code from text (e.g., "ACTG - Accounting - ( SB, ED )" -> "ACTG")
+                result.append((value, text.split(' - ')[0].strip()))
+
+        logger.info(f"Found {len(result)} department options")
+        return result
+
+    def build_search_request(self, form: lxml.html.FormElement, value: str) -> FetchRequest:
+        """Build the POST that the 'Search Courses' button submits for one subject in the Fall/Winter session."""
+        fields = dict(form.form_values())
+
+        session_name = form.xpath(".//select[@id='sessionSelect']/@name")
+        if session_name:
+            fields[session_name[0]] = "1"  # Value 1 corresponds to Fall/Winter
+        fields[form.xpath(".//select[@id='subjectSelect']/@name")[0]] = value
+
+        search_button = form.xpath(".//input[@value='Search Courses']")
+        if search_button and search_button[0].get('name'):
+            fields[search_button[0].get('name')] = search_button[0].get('value')
+
+        return FetchRequest(urljoin(form.base_url, form.get('action') or ''),
+                            method=(form.get('method') or 'POST').upper(), data=fields)
+
+    def parse_course_rows(self, document: lxml.html.HtmlElement, department_code: str) -> int:
+        found = 0
+        for row in document.xpath(self.COURSE_ROWS_XPATH):
+            cells = row.xpath('./td')
+            if len(cells) < 2:
+                continue
+
+            # First cell contains course code and credits, second cell the course title
+            parts = cells[0].text_content().split()
+            course_title = ' '.join(cells[1].text_content().split())
+
+            # Extract course code from the first cell (e.g., "SB/ACTG 2010   3.00" -> "ACTG 2010")
+            course_code = f"{parts[0].split('/')[-1]} {parts[1]}" if len(parts) >= 3 else ""
+
+            if course_code and course_title:
+                self.add_course(department_code, course_code, course_title)
+                found += 1
+        return found
+
+    def scrape_department_http(self, value: str, department_code: str) -> None:
+        # WebObjects action URLs are tied to the page that rendered them, so
+        # each search starts from a freshly loaded subject form
+        form = self.open_subject_form()
+        if form is None:
+            raise RetryableError("Could not load subject search form")
+
+        document = self.fetch_document(self.build_search_request(form, value))
+        if document is None:
+            raise RetryableError(f"Search request failed for department {department_code}")
+
+        if document.xpath("//*[contains(text(), 'No courses were found.')]"):
+            logger.info(f"No courses found for department {department_code}, skipping...")
+            return
+
+        if not self.parse_course_rows(document, department_code):
+            logger.warning(f"No course rows found for department {department_code}, skipping...")
+
+    def scrape_department_item(self, i: int, value: str, department_code: str, total: int) -> bool:
+        """Work queue handler for either backend. Returns whether the department had any courses."""
+        logger.info(f"Scraping department: {department_code} ({i}/{total})")
+        if self.backend == "http":
+            self.scrape_department_http(value, department_code)
+        else:
+            with self.paced(self.BASE_URL):
+                self.scrape_department(value, department_code)
+        self.complete_department(department_code)
+
+        if department_code not in self.department_courses:
+            logger.warning(f"No courses found for department {department_code}")
+            return False
+        logger.info(f"Found {len(self.department_courses[department_code])} courses for department {department_code}")
+        return True
+
+    def scrape_departments(self, departments: List[Tuple[str, str]]) -> Dict[str, List[Dict[str, str]]]:
+        departments = self.pending_departments(departments, lambda department: department[1])
+
+        total = len(departments)
+        work_items = [(i, value, department_code) for i, (value, department_code) in enumerate(departments, 1)]
+        results = self.run_work_queue(work_items, lambda item: self.scrape_department_item(*item, total),
+                                      describe=lambda item: f"Department {item[2]}")
+
+        logger.info(f"Successfully scraped {sum(1 for found in results if found)}/{total} departments")
+        return self.department_courses
+
+    def run_http(self) -> Dict[str, List[Dict[str, str]]]:
+        departments = self.get_department_options_http()
+        logger.info(f"Found {len(departments)} departments")
+        return self.scrape_departments(departments)
+
+    def run_selenium(self) -> Dict[str, List[Dict[str, str]]]:
         try:
             self.driver.get(self.BASE_URL)
-            self.random_delay()
             
             # # Wait for initial page load
             # time.sleep(2)  # Reduced initial wait time
             
             departments = self.get_department_options()
             logger.info(f"Found {len(departments)} departments")
-            
-            total = len(departments)
-            successful_departments = 0
-            for i, (value, department_code) in enumerate(departments, 1):
-                try:
-                    logger.info(f"Scraping department: {department_code} ({i}/{total})")
-                    
-                    self.scrape_department(value, department_code)
-                    
-                    if department_code in self.department_courses:
-                        successful_departments += 1
-                        logger.info(f"Found {len(self.department_courses[department_code])} courses for department {department_code}")
-                    else:
-                        logger.warning(f"No courses found for department {department_code}")
-                    
-                    self.random_delay()
-                    
-                except Exception as e:
-                    logger.error(f"Error processing department {department_code}: {e}")
-                    continue
-            
-            logger.info(f"Successfully scraped {successful_departments}/{total} departments")
-            return self.department_courses
+            return self.scrape_departments(departments)
             
         except Exception as e:
             logger.error(f"Error in run: {e}")
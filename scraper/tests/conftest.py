@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper's modules import one another as top-level modules, as they do when run from scraper/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import json
+import time
+
+import pytest
+
+import checkpoint
+from checkpoint import ScrapeCheckpoint
+
+MATH = [{"course_tag": "MATH 101", "course_name": "Calculus I"}]
+PHYSICS = [{"course_tag": "PHYS 101", "course_name": "Mechanics"}]
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def scrape_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", str(tmp_path))
+    return ScrapeCheckpoint("Test University")
+
+
+def test_checkpoint_round_trip(scrape_checkpoint):
+    scrape_checkpoint.start(resume=False)
+    scrape_checkpoint.record("Math", MATH)
+    scrape_checkpoint.record("Physics", PHYSICS)
+    scrape_checkpoint.close()
+
+    assert ScrapeCheckpoint("Test University").load(DAY) == {"Math": MATH, "Physics": PHYSICS}
+
+
+def test_resume_appends_and_a_fresh_run_starts_over(scrape_checkpoint):
+    scrape_checkpoint.start(resume=False)
+    scrape_checkpoint.record("Math", MATH)
+    scrape_checkpoint.close()
+
+    scrape_checkpoint.start(resume=True)
+    scrape_checkpoint.record("Physics", PHYSICS)
+    scrape_checkpoint.close()
+    assert set(scrape_checkpoint.load(DAY)) == {"Math", "Physics"}
+
+    scrape_checkpoint.start(resume=False)
+    scrape_checkpoint.close()
+    assert scrape_checkpoint.load(DAY) == {}
+
+
+def test_load_skips_stale_and_truncated_entries(scrape_checkpoint):
+    scrape_checkpoint.start(resume=False)
+    scrape_checkpoint.close()
+    with open(scrape_checkpoint.path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"department": "Old", "completed_at": time.time() - 2 * DAY, "courses": MATH}) + '\n')
+        f.write(json.dumps({"department": "Math", "completed_at": time.time(), "courses": MATH}) + '\n')
+        f.write('{"department": "Physics", "compl')
+
+    assert scrape_checkpoint.load(DAY) == {"Math": MATH}
+
+
+def test_a_later_entry_for_a_department_wins(scrape_checkpoint):
+    scrape_checkpoint.start(resume=False)
+    scrape_checkpoint.record("Math", MATH)
+    scrape_checkpoint.record("Math", MATH + PHYSICS)
+    scrape_checkpoint.close()
+
+    assert scrape_checkpoint.load(DAY) == {"Math": MATH + PHYSICS}
+
+
+def test_truncate_keeps_only_the_given_departments(scrape_checkpoint):
+    scrape_checkpoint.start(resume=False)
+    scrape_checkpoint.record("Math", MATH)
+    scrape_checkpoint.record("Physics", PHYSICS)
+    scrape_checkpoint.truncate({"Math"})
+    scrape_checkpoint.record("Chemistry", PHYSICS)
+    scrape_checkpoint.close()
+
+    assert set(scrape_checkpoint.load(DAY)) == {"Math", "Chemistry"}
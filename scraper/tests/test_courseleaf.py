@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("selenium")
+
+from scrapers.courseleaf_scraper import parse_sitemap
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url>
+    <loc>https://calendar.example.ca/courses/math/</loc>
+    <lastmod>2024-05-01</lastmod>
+  </url>
+  <url>
+    <loc> https://calendar.example.ca/courses/phys </loc>
+    <lastmod>2024-06-15T10:00:00Z</lastmod>
+  </url>
+  <url>
+    <loc>https://calendar.example.ca/courses/chem/</loc>
+  </url>
+</urlset>
+"""
+
+
+def test_parse_sitemap():
+    assert parse_sitemap(SITEMAP) == {
+        "https://calendar.example.ca/courses/math": "2024-05-01",
+        "https://calendar.example.ca/courses/phys": "2024-06-15T10:00:00Z",
+    }
+
+
+def test_parse_sitemap_without_namespace():
+    xml = b"<urlset><url><loc>https://example.ca/a/</loc><lastmod>2024-01-01</lastmod></url></urlset>"
+
+    assert parse_sitemap(xml) == {"https://example.ca/a": "2024-01-01"}
+
+
+def test_parse_sitemap_recovers_from_truncation():
+    xml = SITEMAP[:SITEMAP.index(b"<url>\n    <loc>https://calendar.example.ca/courses/chem")] + b"<url><loc>https://cal"
+
+    assert len(parse_sitemap(xml)) == 2
+
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+from database import diff_courses
+
+
+def course(tag, name):
+    return {"course_tag": tag, "course_name": name}
+
+
+def test_diff_courses_classifies_rows():
+    existing = {
+        ("Math", "MATH 101"): ("Math", "Calculus I", False),
+        ("Math", "MATH 102"): ("Math", "Old name", False),
+        ("Math", "MATH 103"): ("Math", "Linear Algebra", True),
+        ("Math", "MATH 104"): ("Math", "Dropped", False),
+    }
+    scraped = {"Math": [course("MATH 101", "Calculus I"), course("MATH 102", "Calculus II"),
+                        course("MATH 103", "Linear Algebra"), course("MATH 105", "Statistics")]}
+
+    diff = diff_courses(existing, scraped)
+
+    assert diff["inserts"] == [("Math", "MATH 105", "Statistics")]
+    assert diff["renames"] == [("Math", "MATH 102", "Calculus II")]
+    assert diff["restores"] == [("Math", "MATH 103", "Linear Algebra")]
+    assert diff["deletes"] == [("Math", "MATH 104")]
+    assert diff["unchanged"] == 1
+
+
+def test_diff_courses_only_deletes_from_scraped_departments():
+    existing = {("Physics", "PHYS 101"): ("Physics", "Mechanics", False)}
+
+    diff = diff_courses(existing, {"Math": [course("MATH 101", "Calculus I")]})
+
+    assert diff["deletes"] == []
+
+
+def test_diff_courses_ignores_repeated_tags_and_accepts_pairs():
+    scraped = [("Math", [course("MATH 101", "Calculus I"), course("MATH 101", "Calculus I (again)")])]
+
+    diff = diff_courses({}, iter(scraped))
+
+    assert diff["inserts"] == [("Math", "MATH 101", "Calculus I")]
+
+
+def test_diff_courses_leaves_archived_courses_archived():
+    existing = {("Math", "MATH 103"): ("Math", "Linear Algebra", True)}
+
+    diff = diff_courses(existing, {"Math": []})
+
+    assert diff == {"inserts": [], "renames": [], "restores": [], "deletes": [], "unchanged": 0}
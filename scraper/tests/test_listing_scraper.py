@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("bs4")
+pytest.importorskip("selenium")
+
+from scrapers.listing_scraper import listing_links
+
+BASE_URL = "https://calendar.example.ca/courses/"
+
+
+def test_listing_links_from_server_rendered_table():
+    html = """
+    <table id="departments">
+      <tr><th>Department</th><th>Faculty</th></tr>
+      <tr><td><a href="math.html">Mathematics</a></td><td><a href="/faculties/science">Science</a></td></tr>
+      <tr><td><a href="https://other.example.ca/phys">  Physics
+          and Astronomy </a></td><td>Science</td></tr>
+      <tr><td>No link</td><td><a href="ignored.html">Ignored</a></td></tr>
+    </table>
+    """
+
+    assert listing_links(html, BASE_URL) == {
+        "Mathematics": "https://calendar.example.ca/courses/math.html",
+        "Physics and Astronomy": "https://other.example.ca/phys",
+    }
+
+
+def test_listing_links_prefers_the_sorted_column():
+    html = """
+    <table>
+      <tr><td><a href="a.html">Code</a></td><td class="sorting_1"><a href="math.html">Mathematics</a></td></tr>
+    </table>
+    """
+
+    assert listing_links(html, BASE_URL) == {"Mathematics": "https://calendar.example.ca/courses/math.html"}
+
+
+def test_listing_links_without_a_table():
+    assert listing_links("<p>Maintenance</p>", BASE_URL) == {}
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+import manifest
+from manifest import ScrapeManifest, manifest_path, record_import, unchanged_departments
+
+DATABASE = "localhost:5432/ratethatclass"
+
+
+@pytest.fixture(autouse=True)
+def manifest_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", str(tmp_path))
+
+
+def write_manifest(sources, imported=None):
+    with open(manifest_path("Test University"), 'w', encoding='utf-8') as f:
+        json.dump({"sources": sources, "imported": imported or {}}, f)
+
+
+def source(digest, *departments):
+    return {"hash": digest, "departments": list(departments), "unchanged": False}
+
+
+def test_nothing_is_unchanged_before_the_first_import():
+    write_manifest({"math": source("a", "Math")})
+
+    assert unchanged_departments("Test University", DATABASE) == set()
+
+
+def test_departments_unchanged_since_their_import():
+    write_manifest({"math": source("a", "Math"), "physics": source("b", "Physics")},
+                   {DATABASE: {"math": "a", "physics": "old"}})
+
+    assert unchanged_departments("Test University", DATABASE) == {"Math"}
+
+
+def test_a_department_with_any_changed_source_is_changed():
+    write_manifest({"listing": source("a", "Math", "Physics"), "physics": source("b", "Physics")},
+                   {DATABASE: {"listing": "a", "physics": "old"}})
+
+    assert unchanged_departments("Test University", DATABASE) == {"Math"}
+
+
+def test_imports_are_tracked_per_database():
+    write_manifest({"math": source("a", "Math")})
+    record_import("Test University", DATABASE)
+
+    assert unchanged_departments("Test University", DATABASE) == {"Math"}
+    assert unchanged_departments("Test University", "otherhost:5432/ratethatclass") == set()
+
+
+def test_legacy_flat_imported_map_matches_no_database():
+    write_manifest({"math": source("a", "Math")}, {"math": "a"})
+
+    assert unchanged_departments("Test University", DATABASE) == set()
+
+
+def test_missing_manifest():
+    assert unchanged_departments("Test University", DATABASE) == set()
+
+
+def test_discard_forgets_sources_of_departments_scraped_again():
+    scrape = ScrapeManifest("Test University")
+    scrape.record("math", "a", ["Math"], unchanged=False)
+    scrape.record("listing", "b", ["Math", "Physics"], unchanged=False)
+
+    scrape.discard({"Math"})
+
+    assert list(scrape.sources) == ["math"]
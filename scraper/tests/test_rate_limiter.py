@@ -0,0 +1,77 @@
+import email.utils
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from scrapers.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 5 ") == 5.0
+
+
+def test_parse_retry_after_http_date():
+    value = email.utils.formatdate(time.time() + 60, usegmt=True)
+
+    assert 55 <= parse_retry_after(value) <= 60
+
+
+def test_parse_retry_after_past_date_is_zero():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.parametrize("value", [None, "", "soon", "-5"])
+def test_parse_retry_after_invalid(value):
+    assert parse_retry_after(value) is None
+
+
+def test_fast_successes_raise_the_rate_up_to_max_rate():
+    limiter = AdaptiveRateLimiter("example.com", rate=2.0, max_rate=2.2, increase=0.1)
+
+    limiter.record(0.1, ok=True)
+    assert limiter.rate == pytest.approx(2.1)
+    for _ in range(5):
+        limiter.record(0.1, ok=True)
+    assert limiter.rate == pytest.approx(2.2)
+
+
+def test_slow_successes_hold_the_rate():
+    limiter = AdaptiveRateLimiter("example.com", rate=2.0, increase=0.1, latency_factor=2.0)
+    limiter.record(0.1, ok=True)
+
+    limiter.record(1.0, ok=True)
+
+    assert limiter.rate == pytest.approx(2.1)
+
+
+def test_throttling_halves_the_rate_once_per_second():
+    limiter = AdaptiveRateLimiter("example.com", rate=4.0, min_rate=1.5)
+
+    limiter.record(0.1, ok=False, status=429)
+    limiter.record(0.1, ok=False, status=503)
+    assert limiter.rate == pytest.approx(2.0)
+    assert limiter.throttled == 2
+
+    limiter._last_decrease -= 1.0
+    limiter.record(0.1, ok=False, status=None)
+    assert limiter.rate == pytest.approx(1.5)
+
+
+def test_client_errors_do_not_slow_down():
+    limiter = AdaptiveRateLimiter("example.com", rate=4.0)
+
+    limiter.record(0.1, ok=False, status=404)
+
+    assert limiter.rate == 4.0
+    assert limiter.throttled == 0
+
+
+def test_retry_after_pauses_the_host():
+    limiter = AdaptiveRateLimiter("example.com", rate=100.0)
+
+    limiter.record(0.1, ok=False, status=429, retry_after=30)
+
+    assert limiter.reserve() > 29
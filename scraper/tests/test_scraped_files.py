@@ -0,0 +1,95 @@
+import json
+import os
+
+import msgpack
+import pytest
+
+from scraped_files import (SNAPSHOT_VERSION, NdjsonWriter, count_courses, iter_departments, iter_ndjson,
+                           read_departments, read_snapshot, write_snapshot)
+
+DEPARTMENTS = {
+    "Mathematics": [{"course_tag": "MATH 101", "course_name": "Calculus I"},
+                    {"course_tag": "MATH 102", "course_name": "Calculus II"}],
+    "Français": [{"course_tag": "FRA 1500", "course_name": "Écriture\tet \"style\"\n"}],
+}
+
+
+def test_ndjson_round_trip(tmp_path):
+    writer = NdjsonWriter("Test University", "TestScraper", data_dir=str(tmp_path))
+    assert writer.write_new(DEPARTMENTS) == 3
+    writer.close()
+
+    assert not os.path.exists(writer.partial_path)
+    header, courses = iter_ndjson(writer.path)
+    assert header["university_name"] == "Test University"
+    assert header["scraper_used"] == "TestScraper"
+    assert dict(iter_departments(courses)) == DEPARTMENTS
+
+
+def test_ndjson_appends_only_new_courses(tmp_path):
+    writer = NdjsonWriter("Test University", "TestScraper", data_dir=str(tmp_path))
+    departments = {"Mathematics": DEPARTMENTS["Mathematics"][:1]}
+    writer.write_new(departments, "Mathematics")
+    departments["Mathematics"] = DEPARTMENTS["Mathematics"]
+    assert writer.write_new(departments, "Mathematics") == 1
+    writer.close()
+
+    assert read_departments(writer.path) == {"Mathematics": DEPARTMENTS["Mathematics"]}
+    assert writer.courses_written == 2
+    assert writer.departments_written == 1
+
+
+def test_ndjson_abort_keeps_the_partial_file(tmp_path):
+    writer = NdjsonWriter("Test University", "TestScraper", data_dir=str(tmp_path))
+    writer.write_new(DEPARTMENTS)
+    writer.abort()
+
+    assert not os.path.exists(writer.path)
+    _, courses = iter_ndjson(writer.partial_path)
+    assert dict(iter_departments(courses)) == DEPARTMENTS
+
+
+
+def test_ndjson_reset_discards_what_was_written(tmp_path):
+    writer = NdjsonWriter("Test University", "TestScraper", data_dir=str(tmp_path))
+    writer.write_new(DEPARTMENTS)
+    writer.reset({"Mathematics": DEPARTMENTS["Mathematics"]})
+    writer.close()
+
+    assert read_departments(writer.path) == {"Mathematics": DEPARTMENTS["Mathematics"]}
+    assert writer.courses_written == 2
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "Test_University_data.snapshot")
+    write_snapshot(path, "Test University", "TestScraper", {**DEPARTMENTS, "Empty": []})
+
+    header, departments = read_snapshot(path)
+    assert header["university_name"] == "Test University"
+    assert header["scraper_used"] == "TestScraper"
+    # Departments without courses are not stored
+    assert dict(departments) == DEPARTMENTS
+    assert read_departments(path) == DEPARTMENTS
+
+
+def test_snapshot_rejects_other_versions(tmp_path):
+    path = tmp_path / "Test_University_data.snapshot"
+    path.write_bytes(msgpack.packb({"version": SNAPSHOT_VERSION + 1}))
+
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+
+
+def test_count_courses_in_every_format(tmp_path):
+    json_path = tmp_path / "Test_University_data.json"
+    json_path.write_text(json.dumps({"university_name": "Test University", "departments": DEPARTMENTS}, indent=2),
+                         encoding='utf-8')
+    snapshot_path = str(tmp_path / "Test_University_data.snapshot")
+    write_snapshot(snapshot_path, "Test University", "TestScraper", DEPARTMENTS)
+    writer = NdjsonWriter("Test University", "TestScraper", data_dir=str(tmp_path))
+    writer.write_new(DEPARTMENTS)
+    writer.close()
+
+    assert count_courses(str(json_path)) == 3
+    assert count_courses(snapshot_path) == 3
+    assert count_courses(writer.path) == 3
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("bs4")
+pytest.importorskip("selenium")
+
+from scrapers.waterloo_scraper import iter_schedule_rows
+
+SCHEDULE = """<html><body>
+<table class="banner"><tr><td>Schedule of Classes</td><td>Fall 2024</td><td>Updated daily</td></tr></table>
+<table>
+  <tr><th>Subject</th><th>Catalog</th><th>Course Title</th></tr>
+  <tr><td>CS</td><td>135</td><td>Designing Functional Programs</td></tr>
+  <tr><td>CS</td><td>136</td><td>Elementary Algorithm Design
+      <table><tr><td>LEC</td><td>001</td><td>MWF</td></tr></table></td></tr>
+  <tr><td>MATH</td><td>135</td><td>Algebra for Honours Mathematics</td></tr>
+</table>
+<table><tr><td>Footer</td><td>Page 1</td><td>of 1</td></tr></table>
+</body></html>"""
+
+EXPECTED = [
+    ("CS", "135", "Designing Functional Programs"),
+    # A nested table's rows are read, and emptied, before the row around it ends
+    ("CS", "136", "Elementary Algorithm Design"),
+    ("MATH", "135", "Algebra for Honours Mathematics"),
+]
+
+
+def chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+def test_rows_of_the_table_with_the_schedule_header():
+    assert list(iter_schedule_rows([SCHEDULE])) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_rows_are_the_same_however_the_page_is_chunked(size):
+    assert list(iter_schedule_rows(chunked(SCHEDULE, size))) == EXPECTED
+
+
+def test_no_rows_without_a_schedule_header():
+    html = "<table><tr><td>CS</td><td>135</td><td>Designing Functional Programs</td></tr></table>"
+
+    assert list(iter_schedule_rows([html])) == []
@@ -0,0 +1,85 @@
+import contextlib
+
+import pytest
+
+# Importing from the scrapers package loads every scraper, and with them Selenium
+pytest.importorskip("selenium")
+
+from scrapers.work_queue import RetryableError, WorkQueue
+
+
+def flaky(failures):
+    """A handler that raises RetryableError the first failures[item] times it sees item."""
+    attempts = {}
+
+    def handler(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if attempts[item] <= failures.get(item, 0):
+            raise RetryableError("try again")
+        return item * 10
+
+    handler.attempts = attempts
+    return handler
+
+
+def test_retryable_items_are_requeued_until_they_succeed():
+    handler = flaky({2: 2})
+    queue = WorkQueue(handler, workers=2, max_attempts=3, base_delay=0)
+
+    assert queue.run([1, 2, 3]) == [10, 20, 30]
+    assert handler.attempts[2] == 3
+    assert queue.retries == 2
+    assert queue.failed == []
+
+
+def test_an_item_fails_after_max_attempts():
+    handler = flaky({2: 5})
+    queue = WorkQueue(handler, max_attempts=3, retry_budget=10, base_delay=0)
+
+    assert queue.run([1, 2]) == [10, None]
+    assert handler.attempts[2] == 3
+    assert queue.failed == [2]
+
+
+def test_the_retry_budget_caps_retries_across_items():
+    handler = flaky({1: 1, 2: 1, 3: 1})
+    queue = WorkQueue(handler, max_attempts=3, retry_budget=1, base_delay=0)
+
+    results = queue.run([1, 2, 3])
+
+    assert queue.retries == 1
+    assert len(queue.failed) == 2
+    assert results.count(None) == 2
+
+
+def test_other_exceptions_fail_the_item_without_retrying():
+    attempts = []
+
+    def handler(item):
+        attempts.append(item)
+        raise ValueError("broken")
+
+    queue = WorkQueue(handler, max_attempts=3, base_delay=0)
+
+    assert queue.run(["a"]) == [None]
+    assert attempts == ["a"]
+    assert queue.failed == ["a"]
+
+
+def test_items_fail_when_no_worker_can_start():
+    @contextlib.contextmanager
+    def broken_context():
+        raise RuntimeError("no browser")
+        yield
+
+    queue = WorkQueue(lambda item: item, workers=2, worker_context=broken_context)
+
+    assert queue.run([1, 2, 3]) == [None, None, None]
+    assert sorted(queue.failed) == [1, 2, 3]
+
+
+def test_backoff_stays_within_the_exponential_step():
+    queue = WorkQueue(lambda item: item, base_delay=1.0, max_delay=5.0)
+
+    for attempt, step in ((1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)):
+        assert step / 2 <= queue.backoff(attempt) <= step
@@ -2,14 +2,16 @@ import json
 import os
 import time
 import traceback
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from checkpoint import ScrapeCheckpoint
 from logger import setup_logger
+from scraped_files import DATA_DIR, NdjsonWriter, university_file_stem, write_snapshot
 
 logger = setup_logger(__name__)
 from unidecode import unidecode
 
-def save_to_json(university_name: str, departments: Dict[str, List[Dict[str, str]]], scraper_name: str) -> None:
-    """Save scraped data to a JSON file."""
+def save_to_json(university_name: str, departments: Dict[str, List[Dict[str, str]]], scraper_name: str) -> bool:
+    """Save scraped data to a JSON file. Returns whether it was written."""
     try:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         data_dir = os.path.join(current_dir, "scraped_data")
@@ -17,9 +19,7 @@ def save_to_json(university_name: str, departments: Dict[str, List[Dict[str, str
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
         
-        safe_university_name = "".join(c for c in university_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_university_name = safe_university_name.replace(' ', '_')
-        filename = f"{safe_university_name}_data.json"
+        filename = f"{university_file_stem(university_name)}_data.json"
         filepath = os.path.join(data_dir, filename)
         
         data = {
@@ -36,28 +36,94 @@ def save_to_json(university_name: str, departments: Dict[str, List[Dict[str, str
         
         logger.info(f"Data saved to {filepath}")
         logger.info(f"Saved {data['total_departments']} departments with {data['total_courses']} total courses")
+        return True
         
     except Exception as e:
         logger.error(f"Error saving data to JSON: {e}")
+        return False
 
-def run_scraper(scraper_class: Any, headless: bool = True) -> tuple[str | None, Dict[str, List[Dict[str, str]]]]:
-    """Run a single scraper and return the results."""
+def save_to_snapshot(university_name: str, departments: Dict[str, List[Dict[str, str]]], scraper_name: str) -> bool:
+    """Save scraped data to a compressed columnar snapshot. Returns whether it was written."""
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        filepath = os.path.join(DATA_DIR, f"{university_file_stem(university_name)}_data.snapshot")
+        
+        write_snapshot(filepath, university_name, scraper_name, departments)
+        
+        total_courses = sum(len(courses) for courses in departments.values())
+        logger.info(f"Data saved to {filepath} ({os.path.getsize(filepath) / 1024:.0f} KiB)")
+        logger.info(f"Saved {len(departments)} departments with {total_courses} total courses")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error saving data to snapshot: {e}")
+        return False
+
+def save_scraped_data(university_name: str, departments: Dict[str, List[Dict[str, str]]], scraper_name: str,
+                      output_format: str = 'json') -> bool:
+    """Save scraped data in a whole-file format, json or snapshot. Returns whether it was written."""
+    if output_format == 'snapshot':
+        return save_to_snapshot(university_name, departments, scraper_name)
+    return save_to_json(university_name, departments, scraper_name)
+
+def save_to_ndjson(output: NdjsonWriter, departments: Dict[str, List[Dict[str, str]]]) -> None:
+    """Write the departments the scraper did not already stream and publish the NDJSON file."""
+    output.write_new(departments)
+    output.close()
+    logger.info(f"Data saved to {output.path}")
+    logger.info(f"Saved {output.departments_written} departments with {output.courses_written} total courses")
+
+def run_scraper(scraper_class: Any, headless: bool = True, driver_pool: Any = None,
+                use_cache: bool = True, output_format: str = 'json',
+                resume_max_age: Optional[float] = None) -> tuple[str | None, Dict[str, List[Dict[str, str]]]]:
+    """Run a single scraper and return the results. Selenium scrapers lease Chrome from driver_pool if given.
+
+    With output_format 'ndjson', courses are written to disk as each department completes.
+    Completed departments are checkpointed; with resume_max_age (seconds), departments
+    checkpointed within that window by an earlier run are restored instead of scraped.
+    """
     scraper_name = scraper_class.__name__
     logger.info(f"Starting {scraper_name}")
+    output = None
+    checkpoint = None
     
     try:
-        with scraper_class(headless=headless) as scraper:
+        scraper = scraper_class(headless=headless)
+        scraper.driver_pool = driver_pool
+        scraper.use_http_cache = scraper.use_http_cache and use_cache
+        if output_format == 'ndjson':
+            output = scraper.output = NdjsonWriter(scraper.university_name, scraper_name)
+        checkpoint = scraper.checkpoint = ScrapeCheckpoint(scraper.university_name)
+        if resume_max_age is not None:
+            scraper.restore_departments(checkpoint.load(resume_max_age))
+        checkpoint.start(resume=resume_max_age is not None)
+        with scraper:
             departments = scraper.run()
             university_name = scraper.university_name
             logger.info(f"Successfully scraped {len(departments)} departments with {scraper_name}")
             
-            save_to_json(university_name, departments, scraper_name)
+            if output is not None:
+                save_to_ndjson(output, departments)
+            elif not save_scraped_data(university_name, departments, scraper_name, output_format):
+                # The manifest would otherwise vouch for pages whose courses never reached disk
+                raise RuntimeError(f"Data for {university_name} was not saved; the manifest was left unchanged")
+            # Written only after the data file so reused departments are always present in it
+            if scraper.manifest is not None:
+                scraper.manifest.save()
             
             return university_name, departments
     except Exception as e:
         logger.error(f"Error running {scraper_name}: {e}")
         logger.error(traceback.format_exc())
+        if output is not None:
+            output.abort()
+            logger.info(f"Departments completed before the failure were kept in {output.partial_path}")
+        if checkpoint is not None:
+            logger.info(f"Completed departments are checkpointed in {checkpoint.path}; rerun with --resume to skip them")
         return None, {}
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
 
 def clean_text(text: str) -> str:
     # Convert accented characters to their ASCII equivalents
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""Check Queen's whole-term FOSE search against one search per subject.
+
+Every subject whose courses differ between the two is logged:
+
+    python verify_queens.py
+"""
+
+from scrapers import QueensScraper
+
+
+def main():
+    with QueensScraper(backend="verify") as scraper:
+        scraper.run()
+
+
+if __name__ == "__main__":
+    main()